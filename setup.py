@@ -5,4 +5,9 @@ setup(
     version='1.21',
     packages=find_packages(),
     install_requires=[],
-)
\ No newline at end of file
+    entry_points={
+        'console_scripts': [
+            'zvamz=zvamz.cli:main',
+        ],
+    },
+)
@@ -1,21 +1,68 @@
-from .reports import lowfeereport
-from .reports import dfbgcolcheck
-from .reports import bgdeldup
-from .reports import bgdeldupf
-from .reports import promoreport
-from .reports import spstreport
-from .reports import sbstreport
-from .reports import sdtreport
-from .reports import spcreport
-from .reports import sbcreport
-from .reports import sdcreport
-
-from .ratelimit import RateLimiter
+import importlib
 
+# marketplaces is light and shares its name with its submodule, so it is
+# bound up front to keep later submodule imports from shadowing the class
 from .marketplaces import marketplaces
 
-from .api import zv_client_access
-from .api import shipment_status
-from .api import shipment_items
-from .api import shipment_summary
-from .api import narf_eligibility
+# public name -> submodule that defines it
+# submodules (and pandas, numpy, requests behind them) are only imported
+# the first time one of their names is used
+_lazy_names = {
+    'lowfeereport': 'reports',
+    'dfbgcolcheck': 'reports',
+    'bgdeldup': 'reports',
+    'bgdeldupf': 'reports',
+    'bgdelkeys': 'reports',
+    'promoreport': 'reports',
+    'spstreport': 'reports',
+    'sbstreport': 'reports',
+    'sdtreport': 'reports',
+    'spcreport': 'reports',
+    'sbcreport': 'reports',
+    'sdcreport': 'reports',
+
+    'RateLimiter': 'ratelimit',
+
+    'ParseProfile': 'profiling',
+
+    'fc_to_country': 'fcmap',
+    'FCIndex': 'fcmap',
+
+    'zv_client_access': 'api',
+    'shipment_status': 'api',
+    'shipment_items': 'api',
+    'shipment_summary': 'api',
+    'narf_eligibility': 'api',
+
+    'FingerprintIndex': 'delta',
+
+    'ReportEngine': 'reportengine',
+    'acquire_report': 'reportengine',
+
+    'AccountScheduler': 'scheduler',
+    'pull_accounts': 'scheduler',
+
+    'run_pipeline': 'pipeline',
+    'PipelineContext': 'pipeline',
+
+    'WorkerDaemon': 'daemon',
+}
+
+_submodules = {'api', 'daemon', 'delta', 'fcmap', 'pipeline', 'profiling', 'ratelimit', 'reportengine', 'reports', 'scheduler', 'sinks'}
+
+__all__ = ['marketplaces'] + list(_lazy_names)
+
+
+def __getattr__(name):
+    if name in _lazy_names:
+        module = importlib.import_module(f'.{_lazy_names[name]}', __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    if name in _submodules:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_names) | _submodules)
@@ -2,11 +2,63 @@ import requests
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import time
+from concurrent.futures import ThreadPoolExecutor
 from .ratelimit import RateLimiter
-from .fcmap import fc_to_country
+from .checkpoint import PageCheckpoint
+from .jsonpage import decode_page
+from .fcmap import FCIndex, default_fc_index
+from .dtypes import backend_schema, read_options
+from .reportengine import default_engine
 from .marketplaces import marketplaces
 
+# shared by every pull of the process so pages reuse open connections
+session = requests.Session()
+
+
+def _pull_window(past_days, checkpoint=None):
+    """
+    LastUpdatedAfter and LastUpdatedBefore of a pull.
+    A checkpointed pull saves its window, so a rerun resumes the same window instead of the clock's
+    """
+    def compute():
+        before = datetime.utcnow()
+        return [(before - timedelta(days=past_days)).isoformat(), before.isoformat()]
+
+    window = checkpoint.window(compute) if checkpoint else compute()
+    return datetime.fromisoformat(window[0]), datetime.fromisoformat(window[1])
+
+
+def _window_checkpoint(checkpoint_dir, endpoint, marketplace_id, account, past_days):
+    # holds the window shared by the page checkpoints of one pull
+    if not checkpoint_dir:
+        return None
+    return PageCheckpoint(checkpoint_dir, {
+        'endpoint': endpoint,
+        'marketplace_id': marketplace_id,
+        'account': account,
+        'past_days': past_days,
+        'window': True
+    })
+
+
+def _require_account(checkpoint_dir, checkpoint_account):
+    # access tokens change every run, only a stable account name lets a rerun find its pages
+    if checkpoint_dir and not checkpoint_account:
+        raise ValueError("Error: checkpoint_account is required with checkpoint_dir")
+
+
+def _checkpoint_key(endpoint, marketplace_id, account, request_params):
+    """
+    Key of a checkpointed pull: the seller account, so two sellers of the same marketplace
+    never share pages, and the exact date window
+    """
+    return {
+        'endpoint': endpoint,
+        'marketplace_id': marketplace_id,
+        'account': account,
+        'params': {key: value for key, value in request_params.items() if key != 'MarketplaceId'}
+    }
+
 def zv_client_access(username, region):
     """
     This is authentication process for amazon.
@@ -23,7 +75,70 @@ def zv_client_access(username, region):
     else:
         return ValueError('Error: Not Authenticated')
     
-def shipment_status(marketplace_action, access_token, past_days):
+def _fetch_pages(url, headers, request_params, marketplace_id, data_key, rate_limiter, checkpoint=None, stream_json=False):
+    """
+    Pull every page of a NextToken paginated endpoint.
+    Each page body is decoded only once.
+
+    Parameter:
+    - url: the endpoint url
+    - headers: request headers with the access token
+    - request_params: parameters of the first page
+    - marketplace_id: marketplace id sent with the NextToken requests
+    - data_key: key of the records inside the payload (ex. 'ItemData')
+    - rate_limiter: RateLimiter used for every page request
+    - checkpoint: optional PageCheckpoint to save the pages and resume a crashed pull
+    - stream_json: parse the pages incrementally with ijson instead of loading the whole body
+
+    return:
+    - list of the records and True if the last page was reached
+    """
+    records = []
+    page = 0
+    NextToken = None
+
+    state = checkpoint.load() if checkpoint else None
+    if state:
+        for pageRecords in checkpoint.pages(state['pages']):
+            records.extend(pageRecords)
+        page = state['pages']
+        NextToken = state['next_token']
+        if state['done']:
+            print(f'Reusing {page} saved pages')
+            return records, True
+        print(f'Resuming from page {page}')
+
+    while page == 0 or NextToken:
+        if page == 0:
+            params = request_params
+        else:
+            params = {
+                'MarketplaceId': marketplace_id,
+                'QueryType': 'NEXT_TOKEN',
+                'NextToken': NextToken
+            }
+        # the first page goes through the limiter too, it may be shared with other pulls of the account
+        response = rate_limiter.send_request(session.get, url, headers=headers, params=params, stream=stream_json)
+        if response is None:
+            raise ConnectionError(f'Error: Request for page {page} failed, rerun to resume from the checkpoint')
+
+        pageRecords, NextToken, errors = decode_page(response, data_key, stream_json)
+        if errors:
+            print(errors[0].get('message'))
+            print(errors[0].get('details'))
+            return records, False
+
+        records.extend(pageRecords)
+        if checkpoint:
+            checkpoint.save_page(page, pageRecords, NextToken)
+        page += 1
+
+    print('end of list')
+    return records, True
+
+
+def shipment_status(marketplace_action, access_token, past_days, checkpoint_dir=None, stream_json=False,
+                    rate_limiter=None, fc_index=None, fc_columns=None, checkpoint_account=None):
     """
     This will pull all shipment and its status for specified marketplace
 
@@ -31,6 +146,12 @@ def shipment_status(marketplace_action, access_token, past_days):
     - marketplace_action: the specific marketplace command to pull the data
     - access_token: matching access token of the marketplace
     - past_days: number of days from today's date (UTC)
+    - checkpoint_dir: optional folder to save the fetched pages, a rerun resumes from the last good page
+    - stream_json: parse very large pages incrementally with ijson to lower the peak memory
+    - rate_limiter: optional RateLimiter shared with other pulls of the same account
+    - checkpoint_account: name of the seller account in the checkpoint key, required with checkpoint_dir
+    - fc_index: optional FCIndex, or dictionary of FC overrides, defaults to the one shared by the process
+    - fc_columns: FC columns to add, defaults to ['country'], marketplace, region and timezone are opt-in
 
     return:
     - data frame of the list of shipments and its status
@@ -41,9 +162,10 @@ def shipment_status(marketplace_action, access_token, past_days):
         'IN_TRANSIT', 'DELIVERED', 'CHECKED_IN'
     ]
 
-    rate_limiter = RateLimiter(tokens_per_second=2, capacity=30)
-    NextToken = None
+    _require_account(checkpoint_dir, checkpoint_account)
+    rate_limiter = rate_limiter or RateLimiter(tokens_per_second=2, capacity=30)
     records = []
+    checkpoints = []
 
     regionUrl, MarketplaceId = marketplace_action()
     endpoint = '/fba/inbound/v0/shipments'
@@ -53,47 +175,36 @@ def shipment_status(marketplace_action, access_token, past_days):
         'Content-Type': 'application/json'
     }
 
-    LastUpdatedAfter = (datetime.utcnow() - timedelta(days=past_days)).isoformat()
-    LastUpdatedBefore = datetime.utcnow().isoformat()
+    windowCheckpoint = _window_checkpoint(checkpoint_dir, endpoint, MarketplaceId, checkpoint_account, past_days)
+    LastUpdatedAfter, LastUpdatedBefore = _pull_window(past_days, windowCheckpoint)
+    LastUpdatedAfter, LastUpdatedBefore = LastUpdatedAfter.isoformat(), LastUpdatedBefore.isoformat()
 
+    complete = True
     for ShipmentStatusList in ShipmentStatusLists:
         request_params = {
             'MarketplaceId': MarketplaceId,
             'QueryType': 'DATE_RANGE',
             'ShipmentStatusList': ShipmentStatusList,
             'LastUpdatedAfter': LastUpdatedAfter,
-            'LastUpdatedBefore': LastUpdatedBefore,
-            'NextToken': NextToken
+            'LastUpdatedBefore': LastUpdatedBefore
         }
 
-        try:
-            response = requests.get(url, headers=headers, params=request_params)
-            records.extend(response.json()['payload']['ShipmentData'])
-
-            try:
-                NextToken = response.json()['payload']['NextToken']
-            except:
-                NextToken = None
+        checkpoint = None
+        if checkpoint_dir:
+            checkpoint = PageCheckpoint(checkpoint_dir, _checkpoint_key(endpoint, MarketplaceId, checkpoint_account,
+                                                                        request_params))
+            checkpoints.append(checkpoint)
 
-            while NextToken:
-                request_params_next = {
-                    'MarketplaceId': MarketplaceId,
-                    'QueryType': 'NEXT_TOKEN',
-                    'NextToken': NextToken
-                }
-                response = rate_limiter.send_request(requests.get, url, headers=headers, params=request_params_next)
-                records.extend(response.json()['payload']['ShipmentData'])
+        statusRecords, statusComplete = _fetch_pages(url, headers, request_params, MarketplaceId,
+                                                     'ShipmentData', rate_limiter, checkpoint, stream_json)
+        records.extend(statusRecords)
+        complete = complete and statusComplete
 
-                try:
-                    NextToken = response.json()['payload']['NextToken']
-                except:
-                    NextToken = None
-
-            print('end of list')
-
-        except Exception as e:            
-            print(response.json()['errors'][0]['message'])
-            print(response.json()['errors'][0]['details'])
+    if complete:
+        for checkpoint in checkpoints:
+            checkpoint.clear()
+        if windowCheckpoint:
+            windowCheckpoint.clear()
 
     shipments = []
     for record in records:
@@ -104,12 +215,17 @@ def shipment_status(marketplace_action, access_token, past_days):
             'destination_fulfillment_center': record['DestinationFulfillmentCenterId']
         })
 
-    df = pd.DataFrame(shipments)
-    df['country'] = df['destination_fulfillment_center'].map(fc_to_country)
+    df = pd.DataFrame(shipments, columns=['shipment_id', 'shipment_name', 'shipment_status',
+                                          'destination_fulfillment_center'])
+    if isinstance(fc_index, dict):
+        fc_index = FCIndex(fc_index)
+    fc_index = fc_index or default_fc_index
+    df = fc_index.enrich(df, 'destination_fulfillment_center', fc_columns or ['country'], categorical=False)
 
     return df
 
-def shipment_items(marketplace_action, access_token, past_days):
+def shipment_items(marketplace_action, access_token, past_days, checkpoint_dir=None, stream_json=False,
+                   rate_limiter=None, shards=1, checkpoint_account=None):
     """
     This will pull all shipment and items inside it for specified marketplace.
     Together with the quantity shipped vs received
@@ -118,14 +234,20 @@ def shipment_items(marketplace_action, access_token, past_days):
     - marketplace_action: the specific marketplace command to pull the data
     - access_token: matching access token of the marketplace
     - past_days: number of days from today's date (UTC)
+    - checkpoint_dir: optional folder to save the fetched pages, a rerun resumes from the last good page
+    - stream_json: parse very large pages incrementally with ijson to lower the peak memory
+    - rate_limiter: optional RateLimiter shared with other pulls of the same account
+    - shards: split the date range in this many windows paged through at the same time
+      under the same rate_limiter, useful for long backfills
+    - checkpoint_account: name of the seller account in the checkpoint key, required with checkpoint_dir
 
     return:
     - data frame of the list of shipments and items inside it
     """
-    rate_limiter = RateLimiter(tokens_per_second=2, capacity=30)
-    NextToken = None
-    records = []
-
+    if shards < 1:
+        raise ValueError("Error: shards must be greater than 0")
+    _require_account(checkpoint_dir, checkpoint_account)
+    rate_limiter = rate_limiter or RateLimiter(tokens_per_second=2, capacity=30)
 
     regionUrl, marketplace_id = marketplace_action()
     endpoint = f'/fba/inbound/v0/shipmentItems'
@@ -135,44 +257,45 @@ def shipment_items(marketplace_action, access_token, past_days):
         'Content-Type': 'application/json'
     }
 
-    LastUpdatedAfter = (datetime.utcnow() - timedelta(days=past_days)).isoformat()
-    LastUpdatedBefore = datetime.utcnow().isoformat()
-
-    request_params = {
-        'MarketplaceId': marketplace_id,
-        'LastUpdatedAfter': LastUpdatedAfter,
-        'LastUpdatedBefore': LastUpdatedBefore,
-        'QueryType': 'DATE_RANGE'
-    }
-    
-    try:
-        response = requests.get(url, headers=headers, params=request_params)
-        records.extend(response.json()['payload']['ItemData'])
-
-        try:
-            NextToken = response.json()['payload']['NextToken']
-        except:
-            NextToken = None
+    windowCheckpoint = _window_checkpoint(checkpoint_dir, endpoint, marketplace_id, checkpoint_account, past_days)
+    LastUpdatedAfter, LastUpdatedBefore = _pull_window(past_days, windowCheckpoint)
+    step = (LastUpdatedBefore - LastUpdatedAfter) / shards
 
-        while NextToken:
-            request_params_next = {
-                'MarketplaceId': marketplace_id,
-                'QueryType': 'NEXT_TOKEN',
-                'NextToken': NextToken
-            }
-            response = rate_limiter.send_request(requests.get, url, headers=headers, params=request_params_next)
-            records.extend(response.json()['payload']['ItemData'])
-
-            try:
-                NextToken = response.json()['payload']['NextToken']
-            except:
-                NextToken = None
+    def fetch_window(shard):
+        request_params = {
+            'MarketplaceId': marketplace_id,
+            'LastUpdatedAfter': (LastUpdatedAfter + step * shard).isoformat(),
+            'LastUpdatedBefore': (LastUpdatedAfter + step * (shard + 1)).isoformat(),
+            'QueryType': 'DATE_RANGE'
+        }
 
-        print('end of list')
+        checkpoint = None
+        if checkpoint_dir:
+            checkpoint = PageCheckpoint(checkpoint_dir, _checkpoint_key(endpoint, marketplace_id, checkpoint_account,
+                                                                        request_params))
+
+        windowRecords, complete = _fetch_pages(url, headers, request_params, marketplace_id,
+                                               'ItemData', rate_limiter, checkpoint, stream_json)
+        if complete and checkpoint:
+            checkpoint.clear()
+        return windowRecords, complete
+
+    if shards > 1:
+        with ThreadPoolExecutor(max_workers=shards) as pool:
+            windows = list(pool.map(fetch_window, range(shards)))
+
+        # a shipment updated on a window boundary can come back from both windows
+        records = {}
+        for windowRecords, _ in windows:
+            for record in windowRecords:
+                records[(record['ShipmentId'], record['SellerSKU'], record['FulfillmentNetworkSKU'])] = record
+        records = list(records.values())
+    else:
+        windows = [fetch_window(0)]
+        records = windows[0][0]
 
-    except Exception as e:
-        print(response.json()['errors'][0]['message'])
-        print(response.json()['errors'][0]['details'])
+    if windowCheckpoint and all(complete for _, complete in windows):
+        windowCheckpoint.clear()
 
     df = []
     for record in records:
@@ -202,7 +325,8 @@ def shipment_items(marketplace_action, access_token, past_days):
     shipmentItemsDf = pd.DataFrame(df)
     return shipmentItemsDf 
 
-def shipment_summary(marketplace_action, access_token, past_days):
+def shipment_summary(marketplace_action, access_token, past_days, checkpoint_dir=None, stream_json=False,
+                     rate_limiter=None, dtype_backend=None, shards=1, checkpoint_account=None):
     """
     This will pull all shipment and items inside it for specified marketplace.
     And Summarise the Report
@@ -211,12 +335,20 @@ def shipment_summary(marketplace_action, access_token, past_days):
     - marketplace_action: the specific marketplace command to pull the data
     - access_token: matching access token of the marketplace
     - past_days: number of days from today's date (UTC)
+    - checkpoint_dir: optional folder to save the fetched pages, a rerun resumes from the last good page
+    - stream_json: parse very large pages incrementally with ijson to lower the peak memory
+    - rate_limiter: optional RateLimiter shared with other pulls of the same account
+    - dtype_backend: 'pyarrow' to return pyarrow backed columns, None for numpy/object columns
+    - shards: number of date windows the shipment items are pulled in at the same time
+    - checkpoint_account: name of the seller account in the checkpoint key, required with checkpoint_dir
 
     return:
     - data frame of the report summary
     """
-    shipmentDf = shipment_status(marketplace_action, access_token, past_days)
-    shipmentItemsDf = shipment_items(marketplace_action, access_token, past_days)
+    shipmentDf = shipment_status(marketplace_action, access_token, past_days, checkpoint_dir, stream_json, rate_limiter,
+                                 checkpoint_account=checkpoint_account)
+    shipmentItemsDf = shipment_items(marketplace_action, access_token, past_days, checkpoint_dir, stream_json, rate_limiter,
+                                     shards, checkpoint_account)
 
     shipmentSummaryDf = shipmentDf.merge(shipmentItemsDf, how='inner', on='shipment_id')
     shipmentSummaryDf.insert(0,'date',datetime.utcnow().strftime('%F'))
@@ -236,66 +368,37 @@ def shipment_summary(marketplace_action, access_token, past_days):
         'prep_instruction': str,
         'prep_owner': str
     }
-    shipmentSummaryDf = shipmentSummaryDf.astype(schema)
+    shipmentSummaryDf = shipmentSummaryDf.astype(backend_schema(schema, dtype_backend))
 
     return shipmentSummaryDf
 
-def narf_eligibility(access_token, file_path_name):
-    # Create Report
-    regionUrl, marketplace_id = marketplaces.US()
-    endpoint = f'/reports/2021-06-30/reports'
-    url = regionUrl + endpoint
-    headers = {
-        'x-amz-access-token': access_token,
-        'Content-Type': 'application/json'
-    }
-
-    request_params = {
-        'marketplaceIds': [marketplace_id],
-        'reportType': 'GET_REMOTE_FULFILLMENT_ELIGIBILITY'
-    }
-
-    create_response = requests.post(url, headers=headers, json=request_params,)
-    report_id = create_response.json()['reportId']
-
-    # Check Report Status
-    endpoint = f'/reports/2021-06-30/reports/{report_id}'
-    url = regionUrl + endpoint
+def narf_eligibility(access_token, file_path_name, dtype_backend=None, engine=None, account=None):
+    """
+    This will get the Remote Fulfillment (NARF) eligibility report.
+    A recent report of the same type is reused instead of creating a new one.
 
-    while True:
-        status_response = requests.get(url, headers=headers)
-        status = status_response.json().get("processingStatus")
-        
-        if status == "DONE":
-            print("Report is ready for download!")
-            document_id = status_response.json()["reportDocumentId"]
-            break
-        elif status == "CANCELLED":
-            print("Report creation was cancelled.")
-            exit()
-        elif status == "FAILED":
-            print("Report creation failed.")
-            exit()
-        else:
-            print(f"Report status: {status}. Waiting for report to be ready...")
-            time.sleep(60)  # Wait before checking again
+    Parameter:
+    - access_token: matching access token of the US marketplace
+    - file_path_name: where the downloaded excel report is saved
+    - dtype_backend: 'pyarrow' to return pyarrow backed columns, None for numpy/object columns
+    - engine: optional ReportEngine, defaults to the one shared by the process
+    - account: name of the seller account, only requests of the same account share a report
 
-    # Download Report
-    endpoint = f'/reports/2021-06-30/documents/{document_id}'
-    url = regionUrl + endpoint
-    document_response = requests.get(url, headers=headers)
+    return:
+    - data frame of the eligibility per marketplace
+    """
+    regionUrl, marketplace_id = marketplaces.US()
+    engine = engine or default_engine
 
-    if document_response.status_code == 200:
-        download_url = document_response.json()["url"]
-        report_data = requests.get(download_url)
+    # Create or reuse Report, then download it
+    report_data = engine.document(regionUrl, access_token, 'GET_REMOTE_FULFILLMENT_ELIGIBILITY', [marketplace_id],
+                                  account=account)
 
-        with open(file_path_name, "wb") as f:
-            f.write(report_data.content)
-    else:
-        print("Failed to get the report document:", document_response.json())
+    with open(file_path_name, "wb") as f:
+        f.write(report_data)
 
     #prepare DF
-    narfDf = pd.read_excel(file_path_name,sheet_name='Enrollment',skiprows=3)
+    narfDf = pd.read_excel(file_path_name,sheet_name='Enrollment',skiprows=3,**read_options(dtype_backend))
     narfDf = narfDf.rename(columns=lambda x:x.replace('.1','').replace('.2','').replace('(Yes/No)','')
                                     .replace(' Brazil ','').replace(' Canada ','').replace(' Mexico ','')
                                     .replace('/','_').replace(' ','_')
@@ -324,6 +427,6 @@ def narf_eligibility(access_token, file_path_name):
     'enable_disable': str
     }
 
-    narfFinalDf = narfFinalDf.astype(schema)
+    narfFinalDf = narfFinalDf.astype(backend_schema(schema, dtype_backend))
 
     return narfFinalDf
\ No newline at end of file
@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+import pandas as pd
+from . import reports
+from .profiling import ParseProfile
+from .synthetic import REPORT_LAYOUTS, EXCEL_MAX_ROWS, generate_report
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000, 10000000]
+
+IMPORT_STATEMENTS = {
+    'package': 'import zvamz',
+    'marketplaces': 'import zvamz; zvamz.marketplaces.US()',
+    'fc_to_country': "import zvamz; zvamz.fc_to_country['YEG2']",
+    'RateLimiter': 'import zvamz; zvamz.RateLimiter(2, 30)',
+    'reports': 'import zvamz; zvamz.spcreport',
+    'api': 'import zvamz; zvamz.shipment_status'
+}
+
+
+# run in a fresh interpreter, the arrow pool only keeps the peak of the whole process
+_PEAK_MEMORY_CODE = """
+import sys, json, tracemalloc
+import pyarrow as pa
+from zvamz import reports
+report, filePath = sys.argv[1], sys.argv[2]
+tracemalloc.start()
+getattr(reports, report)(filePath, dtype_backend='pyarrow')
+print(json.dumps([tracemalloc.get_traced_memory()[1], pa.default_memory_pool().max_memory()]))
+"""
+
+
+def _arrow_peak_memory(report: str, filePath: str):
+    """
+    Peak memory of one pyarrow backed run: tracemalloc does not see the arrow buffers,
+    so the peak of the arrow memory pool is measured too, in a separate process
+
+    Returns:
+    - traced python peak and arrow pool peak, in MB
+    """
+    # the child imports the same zvamz, installed or not
+    packageRoot = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [packageRoot, os.environ.get('PYTHONPATH')])))
+    output = subprocess.run([sys.executable, '-c', _PEAK_MEMORY_CODE, report, filePath],
+                            check=True, capture_output=True, text=True, env=env).stdout
+    pythonPeak, arrowPeak = json.loads(output.strip().splitlines()[-1])
+    return pythonPeak / 1024 ** 2, arrowPeak / 1024 ** 2
+
+
+def bench_parser(report: str, filePath: str, repeat: int = 1, memory: bool = True, dtype_backend: str = None):
+    """
+    Time one report function against a file
+
+    Parameters:
+    - report: name of the report function (ex. 'spcreport')
+    - filePath: the path of the raw report
+    - repeat: number of timed runs, the fastest one is kept
+    - memory: also measure the peak memory with a separate traced run
+      (with 'pyarrow' the peak of the arrow memory pool is added, see arrow_peak_mb)
+    - dtype_backend: passed to the report function (None or 'pyarrow')
+
+    Returns:
+    - dictionary of rows, parse_seconds, rows_per_sec, peak_mem_mb, arrow_peak_mb and the seconds of every stage
+    """
+    parser = getattr(reports, report)
+
+    best = None
+    bestProfile = None
+    for _ in range(repeat):
+        profile = ParseProfile()
+        start = time.perf_counter()
+        df = parser(filePath, dtype_backend=dtype_backend, profile=profile)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best, bestProfile = elapsed, profile
+
+    rows = len(df) if isinstance(df, pd.DataFrame) else 0
+    del df
+
+    peakMem = None
+    arrowPeak = None
+    if memory and dtype_backend == 'pyarrow':
+        pythonPeak, arrowPeak = _arrow_peak_memory(report, filePath)
+        peakMem = pythonPeak + arrowPeak
+    elif memory:
+        tracemalloc.start()
+        try:
+            parser(filePath, dtype_backend=dtype_backend)
+            peakMem = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'rows': rows,
+        'parse_seconds': best,
+        'rows_per_sec': rows / best if best else None,
+        'peak_mem_mb': peakMem,
+        'arrow_peak_mb': arrowPeak,
+        **{f"{stage['stage']}_seconds": stage['seconds'] for stage in bestProfile.stages}
+    }
+
+
+def bench_parsers(sizes: list = None, reportNames: list = None, workDir: str = None,
+                  repeat: int = 1, memory: bool = True, seed: int = 0, dtype_backend: str = None):
+    """
+    Generate synthetic reports of every size and time the report functions on them.
+    Excel reports are skipped for sizes above the excel row limit.
+
+    Parameters:
+    - sizes: list of row counts, defaults to 1k up to 10M
+    - reportNames: list of report function names, defaults to all of them
+    - workDir: folder of the generated files, a temporary folder if not given
+    - repeat: number of timed runs per file
+    - memory: also measure the peak memory of each run
+    - seed: seed of the random generator
+    - dtype_backend: passed to the report functions (None or 'pyarrow')
+
+    Returns:
+    - DataFrame with one row per report and size
+    """
+    sizes = sizes or DEFAULT_SIZES
+    reportNames = reportNames or list(REPORT_LAYOUTS)
+
+    tempDir = None
+    if workDir is None:
+        tempDir = tempfile.TemporaryDirectory()
+        workDir = tempDir.name
+
+    results = []
+    try:
+        for report in reportNames:
+            fileFormat = REPORT_LAYOUTS[report]['format']
+            for rows in sizes:
+                if fileFormat == 'xlsx' and rows > EXCEL_MAX_ROWS:
+                    print(f"Skipping {report} at {rows} rows: above the excel row limit")
+                    continue
+
+                filePath = os.path.join(workDir, f'{report}_{rows}.{fileFormat}')
+                if not os.path.exists(filePath):
+                    generate_report(report, rows, filePath, seed)
+
+                result = bench_parser(report, filePath, repeat, memory, dtype_backend)
+                result = {'report': report, 'format': fileFormat, 'size': rows, 'file_mb': os.path.getsize(filePath) / 1024 ** 2, **result}
+                print(f"{report} {rows} rows: {result['parse_seconds']:.3f}s")
+                results.append(result)
+    finally:
+        if tempDir is not None:
+            tempDir.cleanup()
+
+    return pd.DataFrame(results)
+
+
+def bench_import(statements: dict = None, repeat: int = 5):
+    """
+    Time fresh interpreter startups running each statement.
+    The time of a bare interpreter is taken off so only the zvamz cost is left.
+
+    Parameters:
+    - statements: dictionary of label and python statement, defaults to IMPORT_STATEMENTS
+    - repeat: number of runs per statement, the fastest one is kept
+
+    Returns:
+    - DataFrame with the import time in milliseconds per statement
+    """
+    statements = statements or IMPORT_STATEMENTS
+
+    def fastest(code):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], check=True)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    baseline = fastest('pass')
+    results = []
+    for label, code in statements.items():
+        elapsed = fastest(code)
+        print(f"{label}: {(elapsed - baseline) * 1000:.1f}ms")
+        results.append({'statement': label, 'code': code, 'import_ms': (elapsed - baseline) * 1000})
+
+    return pd.DataFrame(results)
+
+
+def main(argv=None):
+    argParser = argparse.ArgumentParser(description='Benchmark the zvamz report functions on synthetic reports')
+    argParser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    argParser.add_argument('--reports', nargs='+', choices=list(REPORT_LAYOUTS), default=None)
+    argParser.add_argument('--workdir', default=None, help='keep the generated files in this folder')
+    argParser.add_argument('--repeat', type=int, default=1)
+    argParser.add_argument('--no-memory', action='store_true', help='skip the peak memory run')
+    argParser.add_argument('--output', default=None, help='save the results to this csv file')
+    argParser.add_argument('--dtype-backend', default=None, choices=['pyarrow'])
+    argParser.add_argument('--imports', action='store_true', help='time the package import instead of the report functions')
+    args = argParser.parse_args(argv)
+
+    if args.imports:
+        resultDf = bench_import(repeat=max(args.repeat, 5))
+    else:
+        resultDf = bench_parsers(args.sizes, args.reports, args.workdir, args.repeat, not args.no_memory,
+                                 dtype_backend=args.dtype_backend)
+    print(resultDf.to_string(index=False))
+    if args.output:
+        resultDf.to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+
+
+class PageCheckpoint:
+    """
+    On-disk store of the pages of one paginated pull.
+    Every fetched page is saved with the NextToken that follows it,
+    so a crashed pull can continue from the last good page.
+    """
+    def __init__(self, directory: str, key: dict, maxAge: float = 86400):
+        """
+        Parameters:
+        - directory: folder where the checkpoints are saved
+        - key: dictionary that identifies the pull (endpoint, marketplace, seller account, date window, filters)
+        - maxAge: seconds after which an unfinished checkpoint is ignored and started over
+        """
+        keyHash = hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        self.key = key
+        self.path = os.path.join(directory, keyHash)
+        self.maxAge = maxAge
+
+    def _state_path(self):
+        return os.path.join(self.path, 'state.json')
+
+    def _page_path(self, index: int):
+        return os.path.join(self.path, f'page_{index:05d}.json')
+
+    def _write(self, path: str, data):
+        # write then rename so a crash never leaves half a file behind
+        tempPath = path + '.tmp'
+        with open(tempPath, 'w') as f:
+            json.dump(data, f)
+        os.replace(tempPath, path)
+
+    def load(self):
+        """
+        Returns:
+        - the saved state (pages, next_token, done, updated) or None if there is nothing to resume
+        """
+        try:
+            with open(self._state_path()) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if time.time() - state['updated'] > self.maxAge:
+            print('Checkpoint is too old, starting over')
+            self.clear()
+            return None
+
+        return state
+
+    def pages(self, count: int):
+        """
+        Yield the records of the saved pages in order
+        """
+        for index in range(count):
+            with open(self._page_path(index)) as f:
+                yield json.load(f)
+
+    def save_page(self, index: int, records: list, nextToken: str = None):
+        """
+        Save one page and the NextToken needed to fetch the page after it
+        """
+        os.makedirs(self.path, exist_ok=True)
+        self._write(self._page_path(index), records)
+        self._write(self._state_path(), {
+            'key': self.key,
+            'pages': index + 1,
+            'next_token': nextToken,
+            'done': nextToken is None,
+            'updated': time.time()
+        })
+
+    def window(self, compute):
+        """
+        Date window of the pull: the window saved by an unfinished run with the same key,
+        otherwise compute() saved for a rerun. A rerun asks for the same window however late it starts.
+
+        Parameters:
+        - compute: function returning the window (ex. [LastUpdatedAfter, LastUpdatedBefore])
+
+        Returns:
+        - the window
+        """
+        windowPath = os.path.join(self.path, 'window.json')
+        try:
+            with open(windowPath) as f:
+                saved = json.load(f)
+            if time.time() - saved['updated'] <= self.maxAge:
+                print(f"Resuming the window {saved['window']}")
+                return saved['window']
+        except (FileNotFoundError, ValueError):
+            pass
+
+        window = compute()
+        os.makedirs(self.path, exist_ok=True)
+        self._write(windowPath, {'key': self.key, 'window': window, 'updated': time.time()})
+        return window
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,75 @@
+import sys
+import argparse
+
+
+def main(argv=None):
+    argParser = argparse.ArgumentParser(prog='zvamz', description='Run zvamz pulls, report parsers and sinks from a job file')
+    commands = argParser.add_subparsers(dest='command', required=True)
+
+    runParser = commands.add_parser('run', help='run the jobs of a job file')
+    runParser.add_argument('jobfile', help='yaml or json job file')
+    runParser.add_argument('--workers', type=int, default=None, help='threads for pulls and sinks')
+    runParser.add_argument('--processes', type=int, default=None, help='processes for parsers, 0 to parse in threads')
+    runParser.add_argument('--only', nargs='+', default=None, help='run only these jobs and their dependencies')
+
+    daemonParser = commands.add_parser('daemon', help='keep pools, tokens and rate limiters warm and run job files sent with submit')
+    daemonParser.add_argument('--socket', default=None, help='unix socket path of the daemon')
+    daemonParser.add_argument('--port', type=int, default=None, help='listen on 127.0.0.1:port instead of a unix socket')
+    daemonParser.add_argument('--token-file', default=None, help='where the tcp token is written, readable by the owner only')
+    daemonParser.add_argument('--workers', type=int, default=8, help='threads for pulls and sinks')
+    daemonParser.add_argument('--processes', type=int, default=None, help='processes for parsers, 0 to parse in threads')
+    daemonParser.add_argument('--per-account', type=int, default=2, help='pulls running at the same time for one account')
+
+    submitParser = commands.add_parser('submit', help='run a job file in a running daemon')
+    submitParser.add_argument('jobfile', nargs='?', default=None, help='yaml or json job file')
+    submitParser.add_argument('--socket', default=None, help='unix socket path of the daemon')
+    submitParser.add_argument('--port', type=int, default=None, help='port of the daemon on 127.0.0.1')
+    submitParser.add_argument('--token-file', default=None, help='token file written by the daemon in tcp mode')
+    submitParser.add_argument('--only', nargs='+', default=None, help='run only these jobs and their dependencies')
+    submitParser.add_argument('--ping', action='store_true', help='check the daemon is running')
+    submitParser.add_argument('--shutdown', action='store_true', help='stop the daemon')
+
+    args = argParser.parse_args(argv)
+
+    if args.command == 'run':
+        from .pipeline import run_pipeline
+        status = run_pipeline(args.jobfile, args.workers, args.processes, args.only)
+        for name, result in status.items():
+            print(f"{name}: {result['status']} ({result['seconds']:.1f}s)")
+        failed = [name for name, result in status.items() if result['status'] != 'done']
+        return 1 if failed else 0
+
+    if args.command == 'daemon':
+        from .daemon import WorkerDaemon, DEFAULT_SOCKET, DEFAULT_TOKEN
+        WorkerDaemon(args.socket or DEFAULT_SOCKET, args.port, args.workers, args.processes, args.per_account,
+                     args.token_file or DEFAULT_TOKEN).serve()
+        return 0
+
+    if args.command == 'submit':
+        from .daemon import submit, DEFAULT_SOCKET, DEFAULT_TOKEN
+        if args.ping:
+            request = {'command': 'ping'}
+        elif args.shutdown:
+            request = {'command': 'shutdown'}
+        elif args.jobfile:
+            # submit sends the current folder, the daemon resolves the relative paths against it
+            request = {'command': 'run', 'jobfile': args.jobfile, 'only': args.only}
+        else:
+            argParser.error('submit needs a jobfile, --ping or --shutdown')
+
+        response = submit(request, args.socket or DEFAULT_SOCKET, args.port, tokenPath=args.token_file or DEFAULT_TOKEN)
+        if 'error' in response:
+            print(response['error'])
+            return 1
+        if request['command'] != 'run':
+            print(response)
+            return 0
+        status = response['status']
+        for name, result in status.items():
+            print(f"{name}: {result['status']} ({result['seconds']:.1f}s)")
+        failed = [name for name, result in status.items() if result['status'] != 'done']
+        return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
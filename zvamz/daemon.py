@@ -0,0 +1,168 @@
+import os
+import hmac
+import json
+import secrets
+import socket
+import threading
+import socketserver
+from .pipeline import PipelineContext, load_jobfile, resolve_paths, run_pipeline
+
+DEFAULT_SOCKET = os.path.join(os.path.expanduser('~'), '.zvamz', 'daemon.sock')
+DEFAULT_TOKEN = os.path.join(os.path.expanduser('~'), '.zvamz', 'daemon.token')
+DEFAULT_PORT = 8765
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    # one json request per line, one json response per line
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.daemon.handle(json.loads(line))
+            except Exception as e:
+                response = {'error': repr(e)}
+            self.wfile.write((json.dumps(response, default=str) + '\n').encode())
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class WorkerDaemon:
+    """
+    Long running process that keeps pandas imported, the HTTP sessions open,
+    the access tokens and the RateLimiter of every account warm,
+    and runs the job files sent to it over a local socket.
+    """
+    def __init__(self, socketPath: str = DEFAULT_SOCKET, port: int = None, workers: int = 8,
+                 processes: int = None, per_account: int = 2, tokenPath: str = DEFAULT_TOKEN):
+        """
+        Parameters:
+        - socketPath: path of the unix socket to listen on
+        - port: listen on 127.0.0.1:port instead of a unix socket, DEFAULT_PORT on systems without unix sockets
+        - tokenPath: in tcp mode, file where the secret every request must carry is written (readable by the owner only)
+        - workers: number of threads for pulls and for sinks
+        - processes: number of processes for parsers, 0 runs them in the threads
+        - per_account: number of pulls running at the same time for one account
+        """
+        self.socketPath = socketPath
+        self.port = DEFAULT_PORT if port is None and not hasattr(socket, 'AF_UNIX') else port
+        self.tokenPath = tokenPath
+        self.token = None
+        self.context = PipelineContext(workers, processes, per_account)
+        self.server = None
+
+    def handle(self, request: dict):
+        """
+        Run one request:
+        - {'command': 'ping'}
+        - {'command': 'run', 'jobfile': path or 'config': dict, 'only': [names], 'cwd': folder}
+        - {'command': 'shutdown'}
+        Relative paths are resolved against cwd, the folder of the submitter.
+        In tcp mode every request also carries the 'token' of the token file.
+        """
+        # a tcp port can be reached by any local user, unlike the owner only unix socket
+        if self.token is not None and not hmac.compare_digest(str(request.get('token', '')), self.token):
+            raise PermissionError("Error: Missing or wrong daemon token")
+
+        command = request.get('command', 'run')
+
+        if command == 'ping':
+            return {'status': 'ok', 'accounts': sorted(self.context.tokens.accounts)}
+
+        if command == 'shutdown':
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {'status': 'shutting down'}
+
+        if command == 'run':
+            cwd = request.get('cwd')
+            if request.get('config'):
+                config = request['config']
+            else:
+                config = load_jobfile(os.path.join(cwd, request['jobfile']) if cwd else request['jobfile'])
+            if cwd:
+                config = resolve_paths(config, cwd)
+            return {'status': run_pipeline(config, only=request.get('only'), context=self.context)}
+
+        raise ValueError(f"Error: Unknown command {command}")
+
+    def serve(self):
+        """
+        Listen until a shutdown command is received
+        """
+        if self.port is not None:
+            folder = os.path.dirname(self.tokenPath)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self.token = secrets.token_hex(32)
+            fd = os.open(self.tokenPath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.token)
+            self.server = _TCPServer(('127.0.0.1', self.port), _Handler)
+            print(f"zvamz daemon listening on 127.0.0.1:{self.port}, token in {self.tokenPath}")
+        else:
+            folder = os.path.dirname(self.socketPath)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            if os.path.exists(self.socketPath):
+                os.remove(self.socketPath)
+            self.server = _UnixServer(self.socketPath, _Handler)
+            os.chmod(self.socketPath, 0o600)
+            print(f"zvamz daemon listening on {self.socketPath}")
+
+        self.server.daemon = self
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if self.port is None and os.path.exists(self.socketPath):
+                os.remove(self.socketPath)
+            if self.port is not None and os.path.exists(self.tokenPath):
+                os.remove(self.tokenPath)
+            self.context.close()
+
+
+def submit(request: dict, socketPath: str = DEFAULT_SOCKET, port: int = None, timeout: float = None,
+           tokenPath: str = DEFAULT_TOKEN):
+    """
+    Send a request to a running daemon and wait for its response
+
+    Parameters:
+    - request: the request (see WorkerDaemon.handle)
+    - socketPath: path of the unix socket of the daemon
+    - port: port of the daemon on 127.0.0.1 when it listens on tcp, DEFAULT_PORT on systems without unix sockets
+    - timeout: seconds to wait for the response, None waits until the run is over
+    - tokenPath: token file written by the daemon in tcp mode
+
+    Returns:
+    - the response dictionary
+    """
+    # relative paths of the job file are relative to the submitter, not to the daemon
+    request = {'cwd': os.getcwd(), **request}
+    if port is None and not hasattr(socket, 'AF_UNIX'):
+        port = DEFAULT_PORT
+    if port is not None:
+        with open(tokenPath) as f:
+            request['token'] = f.read().strip()
+        connection = socket.create_connection(('127.0.0.1', port), timeout=timeout)
+    else:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(timeout)
+        connection.connect(socketPath)
+
+    with connection:
+        connection.sendall((json.dumps(request) + '\n').encode())
+        with connection.makefile('rb') as reader:
+            line = reader.readline()
+
+    if not line:
+        raise ConnectionError("Error: The daemon closed the connection without a response")
+    return json.loads(line)
@@ -0,0 +1,98 @@
+import os
+import numpy as np
+import pandas as pd
+
+
+def rowhash(df: pd.DataFrame, columns: list = None):
+    """
+    Vectorized 64 bit hash of every row
+
+    Parameters:
+    - df: DataFrame to hash
+    - columns: list of columns to hash, defaults to all of them
+
+    Returns:
+    - numpy array of uint64, one hash per row
+    """
+    if columns is not None:
+        df = df[columns]
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+class FingerprintIndex:
+    """
+    Local index of what is already loaded in a table:
+    a hash of the key columns and a fingerprint of the rows under that key.
+    Rows sharing a key are fingerprinted together, so a key changes when any of its rows change.
+    """
+    def __init__(self, path: str, keyColumns: list):
+        """
+        Parameters:
+        - path: the .npz file of the index, created on the first commit
+        - keyColumns: list of columns that identify a row (ex. ['date', 'campaign_name'])
+        """
+        self.path = path
+        self.keyColumns = list(keyColumns)
+        self.keys = np.empty(0, dtype='uint64')
+        self.fingerprints = np.empty(0, dtype='uint64')
+
+        if os.path.exists(path):
+            with np.load(path) as data:
+                self.keys = data['keys']
+                self.fingerprints = data['fingerprints']
+
+    def _fingerprint(self, df: pd.DataFrame):
+        keyHash = rowhash(df, self.keyColumns)
+        if len(keyHash) == 0:
+            return keyHash, keyHash, keyHash
+
+        # sum the row hashes of each key, uint64 additions wrap around
+        order = np.argsort(keyHash, kind='stable')
+        sortedKeys = keyHash[order]
+        starts = np.flatnonzero(np.r_[True, sortedKeys[1:] != sortedKeys[:-1]])
+        fingerprints = np.add.reduceat(rowhash(df)[order], starts)
+        return keyHash, sortedKeys[starts], fingerprints
+
+    def diff(self, df: pd.DataFrame):
+        """
+        Compare a cleaned report with the index
+
+        Parameters:
+        - df: DataFrame about to be uploaded
+
+        Returns:
+        - DataFrame of the new or changed rows to upload
+        - DataFrame of the key columns to delete in the table before the upload (changed keys)
+        """
+        keyHash, keys, fingerprints = self._fingerprint(df)
+
+        position = pd.Index(self.keys).get_indexer(keys)
+        known = position >= 0
+        changed = known.copy()
+        changed[known] = self.fingerprints[position[known]] != fingerprints[known]
+
+        uploadKeys = keys[~known | changed]
+        uploadDf = df[np.isin(keyHash, uploadKeys)]
+        deleteDf = df.loc[np.isin(keyHash, keys[changed]), self.keyColumns].drop_duplicates()
+
+        print(f"{len(uploadDf)} of {len(df)} rows to upload, {len(deleteDf)} keys to delete")
+        return uploadDf, deleteDf
+
+    def commit(self, df: pd.DataFrame):
+        """
+        Record the rows of df as loaded, call it after the upload succeeded
+        """
+        _, keys, fingerprints = self._fingerprint(df)
+
+        merged = pd.Series(self.fingerprints, index=self.keys, dtype='uint64')
+        merged = pd.concat([merged[~merged.index.isin(keys)], pd.Series(fingerprints, index=keys, dtype='uint64')])
+        self.keys = merged.index.to_numpy(dtype='uint64')
+        self.fingerprints = merged.to_numpy(dtype='uint64')
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # np.savez adds .npz to names without it, so write to a name that already has it
+        tempPath = self.path + '.tmp.npz'
+        np.savez(tempPath, keys=self.keys, fingerprints=self.fingerprints)
+        os.replace(tempPath, self.path)
@@ -0,0 +1,70 @@
+import pandas as pd
+
+
+def _arrow_dtypes():
+    import pyarrow as pa
+
+    return {
+        str: pd.ArrowDtype(pa.string()),
+        float: pd.ArrowDtype(pa.float64()),
+        'datetime64[ns]': pd.ArrowDtype(pa.timestamp('ns')),
+        'datetime64[ns, UTC]': pd.ArrowDtype(pa.timestamp('ns', tz='UTC'))
+    }
+
+
+def backend_schema(schema: dict, dtype_backend: str = None):
+    """
+    Translate a report schema to the requested dtype backend
+
+    Parameters:
+    - schema: dictionary of column and numpy type (str, float, 'datetime64[ns]')
+    - dtype_backend: None for numpy/object columns, 'pyarrow' for pyarrow backed columns
+
+    Returns:
+    - the schema to pass to DataFrame.astype
+    """
+    if dtype_backend is None:
+        return schema
+    if dtype_backend != 'pyarrow':
+        raise ValueError(f"Error: Unknown dtype_backend {dtype_backend}")
+
+    arrowDtypes = _arrow_dtypes()
+    return {col: arrowDtypes.get(dtype, dtype) for col, dtype in schema.items()}
+
+
+def read_options(dtype_backend: str = None, csv: bool = False):
+    """
+    Keyword arguments of pd.read_csv / pd.read_excel for the requested dtype backend.
+    With 'pyarrow' csv files are also parsed by the pyarrow engine,
+    so string columns never become python objects.
+    """
+    if dtype_backend is None:
+        return {}
+    if dtype_backend != 'pyarrow':
+        raise ValueError(f"Error: Unknown dtype_backend {dtype_backend}")
+    if csv:
+        return {'dtype_backend': 'pyarrow', 'engine': 'pyarrow'}
+    return {'dtype_backend': 'pyarrow'}
+
+
+def strip_symbols(df: pd.DataFrame, columns, dtype_backend: str = None):
+    """
+    Remove the %, $ and , of formatted numbers in the given columns
+
+    Parameters:
+    - df: DataFrame to clean, changed in place
+    - columns: the columns to clean
+    - dtype_backend: the dtype backend the DataFrame was read with
+
+    Returns:
+    - the cleaned DataFrame
+    """
+    if dtype_backend is None:
+        df[columns] = df[columns].replace({'%':'','\\$':'',',':''}, regex=True)
+        return df
+
+    # pyarrow strings are cleaned with one compute kernel per column, numbers are left as read
+    for col in columns:
+        if pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].str.replace(r'[%$,]', '', regex=True)
+    return df
@@ -1,3 +1,5 @@
+import threading
+
 fc_to_country = {
     'YEG2': 'Canada', 'YYC4': 'Canada', 'AVP1': 'USA', 'LGB8': 'USA', 'RDU4': 'USA', 'HGR6': 'USA',
     'WBW2': 'USA', 'YXU1': 'Canada', 'ONT8': 'USA', 'YHM1': 'Canada', 'PHL7': 'USA', 'SMF3': 'USA',
@@ -13,4 +15,194 @@ fc_to_country = {
     'LTN1': 'UK', 'HAM2': 'Germany', 'WRO5': 'Poland', 'XDS1': 'Germany', 'EUK5': 'Germany', 'MAN2': 'UK',
     'MAN3': 'UK', 'BHX1': 'UK', 'LTN2': 'UK', 'BRS1': 'UK', 'EMA1': 'UK', 'LCJ4': 'Poland', 'LCJ3': 'Poland',
     'RFD2':'USA', 'RMN3':'USA'
-}
\ No newline at end of file
+}
+
+# marketplace, SP-API region and time zone of the countries in fc_to_country
+# Poland FCs serve the German marketplace (there is no PL marketplace action)
+COUNTRY_INFO = {
+    'USA': {'marketplace': 'US', 'region': 'NA', 'timezone': None},
+    'Canada': {'marketplace': 'CA', 'region': 'NA', 'timezone': None},
+    'UK': {'marketplace': 'UK', 'region': 'EU', 'timezone': 'Europe/London'},
+    'Germany': {'marketplace': 'DE', 'region': 'EU', 'timezone': 'Europe/Berlin'},
+    'Poland': {'marketplace': 'DE', 'region': 'EU', 'timezone': 'Europe/Warsaw'}
+}
+
+# US and Canada span several time zones, their FCs are named after the nearest airport
+AIRPORT_TIMEZONES = {
+    'ABE': 'America/New_York', 'ACY': 'America/New_York', 'ALB': 'America/New_York', 'AVP': 'America/New_York',
+    'BDL': 'America/New_York', 'CAE': 'America/New_York', 'CHA': 'America/New_York', 'CLT': 'America/New_York',
+    'CMH': 'America/New_York', 'EWR': 'America/New_York', 'HGR': 'America/New_York', 'ORF': 'America/New_York',
+    'PBI': 'America/New_York', 'PHL': 'America/New_York', 'RDU': 'America/New_York', 'RIC': 'America/New_York',
+    'RMN': 'America/New_York', 'SWF': 'America/New_York', 'TEB': 'America/New_York', 'TMB': 'America/New_York',
+    'WBW': 'America/New_York',
+    'FWA': 'America/Indiana/Indianapolis', 'IND': 'America/Indiana/Indianapolis',
+    'MQJ': 'America/Indiana/Indianapolis',
+    'FTW': 'America/Chicago', 'IAH': 'America/Chicago', 'MDW': 'America/Chicago', 'MEM': 'America/Chicago',
+    'MKC': 'America/Chicago', 'MKE': 'America/Chicago', 'RFD': 'America/Chicago', 'SAT': 'America/Chicago',
+    'STL': 'America/Chicago',
+    'GYR': 'America/Phoenix', 'PHX': 'America/Phoenix',
+    'BFI': 'America/Los_Angeles', 'LAS': 'America/Los_Angeles', 'LAX': 'America/Los_Angeles',
+    'LGB': 'America/Los_Angeles', 'ONT': 'America/Los_Angeles', 'SBD': 'America/Los_Angeles',
+    'SCK': 'America/Los_Angeles', 'SMF': 'America/Los_Angeles', 'VGT': 'America/Los_Angeles',
+    'YHM': 'America/Toronto', 'YOO': 'America/Toronto', 'YOW': 'America/Toronto', 'YXU': 'America/Toronto',
+    'YYZ': 'America/Toronto',
+    'YEG': 'America/Edmonton', 'YYC': 'America/Edmonton',
+    'YVR': 'America/Vancouver', 'YXX': 'America/Vancouver'
+}
+
+FC_COLUMNS = ['country', 'marketplace', 'region', 'timezone']
+
+
+class FCIndex:
+    """
+    Reference table of the fulfillment centers (country, marketplace, region, time zone)
+    joined onto shipments through categorical codes: the FC column is categorized once,
+    the few distinct FCs are looked up, and every row is mapped with one numpy take.
+    FCs missing from the table get the values of known FCs sharing their airport code,
+    the ones left are counted in unknown.
+    """
+    def __init__(self, overrides: dict = None):
+        """
+        Parameters:
+        - overrides: optional dictionary of FC and its country, or of FC and a dictionary
+          of country, marketplace, region and timezone (see override)
+        """
+        self.lock = threading.Lock()
+        self.fcs = {fc: self._describe(fc, country) for fc, country in fc_to_country.items()}
+        self.inferred = {}
+        self.unknown = {}
+        self._table = None
+        if overrides:
+            self.override(overrides)
+
+    @staticmethod
+    def _describe(fc: str, country: str):
+        info = {'country': country, 'marketplace': None, 'region': None, 'timezone': None}
+        info.update(COUNTRY_INFO.get(country, {}))
+        if info['timezone'] is None:
+            info['timezone'] = AIRPORT_TIMEZONES.get(fc[:3])
+        return info
+
+    def override(self, overrides: dict):
+        """
+        Add or correct FCs at runtime
+
+        Parameters:
+        - overrides: dictionary of FC and its country (ex. {'XLX7': 'USA'}), or of FC and a dictionary
+          of the fields to set (ex. {'XLX7': {'country': 'USA', 'timezone': 'America/New_York'}})
+        """
+        with self.lock:
+            for fc, value in overrides.items():
+                if isinstance(value, str):
+                    value = {'country': value}
+                unknownFields = set(value) - set(FC_COLUMNS)
+                if unknownFields:
+                    raise ValueError(f"Error: Unknown FC fields {sorted(unknownFields)}")
+
+                current = self.fcs.get(fc)
+                country = value.get('country', current['country'] if current else None)
+                info = dict(current) if current and current['country'] == country else self._describe(fc, country)
+                info.update(value)
+                self.fcs[fc] = info
+                self.inferred.pop(fc, None)
+            self._table = None
+
+    def _infer(self, fc: str):
+        # a new FC gets the values of the known FCs of the same airport, when they all agree
+        # called with self.lock held, override and other enrich calls change self.fcs
+        matches = {tuple(info[col] for col in FC_COLUMNS)
+                   for known, info in self.fcs.items() if known[:3] == fc[:3] and known not in self.inferred}
+        if len(matches) == 1:
+            return dict(zip(FC_COLUMNS, matches.pop()))
+        return None
+
+    def table(self):
+        """
+        Returns:
+        - DataFrame of the FCs (index) and their categorical country, marketplace, region and timezone
+        """
+        import pandas as pd
+
+        with self.lock:
+            if self._table is None:
+                table = pd.DataFrame.from_dict(self.fcs, orient='index', columns=FC_COLUMNS)
+                self._table = table.astype('category')
+            return self._table
+
+    def enrich(self, df, fcColumn: str = 'destination_fulfillment_center', columns: list = None,
+               categorical: bool = True):
+        """
+        Add the FC columns to a DataFrame
+
+        Parameters:
+        - df: DataFrame with an FC column, changed in place
+        - fcColumn: name of the FC column
+        - columns: FC columns to add, defaults to FC_COLUMNS
+        - categorical: False to add object columns, as fc_to_country.map did
+
+        Returns:
+        - the DataFrame with the FC columns (NaN for unknown FCs)
+        """
+        import numpy as np
+        import pandas as pd
+
+        columns = FC_COLUMNS if columns is None else columns
+        fcs = df[fcColumn].astype('category')
+        codes = fcs.cat.codes.to_numpy()
+        categories = fcs.cat.categories.astype(str)
+
+        table = self.table()
+        position = table.index.get_indexer(categories)
+
+        inferred = {}
+        refresh = False
+        if (position < 0).any():
+            with self.lock:
+                for fc in categories[position < 0]:
+                    if fc in self.fcs:
+                        # added by another thread since the table was built
+                        refresh = True
+                        continue
+                    info = self._infer(fc)
+                    if info is not None:
+                        inferred[fc] = info
+                if inferred:
+                    self.fcs.update(inferred)
+                    self.inferred.update(inferred)
+                    self._table = None
+        if inferred:
+            print(f"FCs added from their airport code: {sorted(inferred)}")
+        if inferred or refresh:
+            table = self.table()
+            position = table.index.get_indexer(categories)
+
+        # rows whose FC is not in the table get code -1, the last element added to every lookup
+        counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+        unknownFcs = {fc: int(count) for fc, count in zip(categories[position < 0], counts[position < 0])}
+        if unknownFcs:
+            with self.lock:
+                for fc, count in unknownFcs.items():
+                    self.unknown[fc] = self.unknown.get(fc, 0) + count
+            print(f"{sum(unknownFcs.values())} of {len(df)} rows with unknown FCs: {unknownFcs}")
+
+        for col in columns:
+            values = table[col]
+            lookup = np.append(values.cat.codes.to_numpy()[position], -1)
+            lookup[:-1][position < 0] = -1
+            column = pd.Categorical.from_codes(lookup[codes], categories=values.cat.categories)
+            df[col] = column if categorical else column.astype(object)
+        return df
+
+    def unknown_stats(self):
+        """
+        Returns:
+        - DataFrame of the unknown FCs and the number of rows seen with them, most frequent first
+        """
+        import pandas as pd
+
+        with self.lock:
+            stats = pd.DataFrame(list(self.unknown.items()), columns=['fc', 'rows'])
+        return stats.sort_values('rows', ascending=False, ignore_index=True)
+
+
+default_fc_index = FCIndex()
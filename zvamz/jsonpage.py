@@ -0,0 +1,84 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def loads(data):
+    """
+    Decode a JSON document, with orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _stream_page(raw, data_key: str):
+    """
+    Walk the JSON events of a page once, building only the records, NextToken and errors
+    """
+    records = []
+    NextToken = None
+    errors = None
+
+    itemPrefix = f'payload.{data_key}.item'
+    builder = None
+    target = None
+    depth = 0
+
+    for prefix, event, value in ijson.parse(raw, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+            if depth == 0:
+                if target == 'records':
+                    records.append(builder.value)
+                else:
+                    errors = builder.value
+                builder = None
+            continue
+
+        if prefix == itemPrefix and event == 'start_map':
+            builder, target, depth = ijson.ObjectBuilder(), 'records', 1
+            builder.event(event, value)
+        elif prefix == 'errors' and event == 'start_array':
+            builder, target, depth = ijson.ObjectBuilder(), 'errors', 1
+            builder.event(event, value)
+        elif prefix == 'payload.NextToken' and event == 'string':
+            NextToken = value
+
+    return records, NextToken, errors
+
+
+def decode_page(response, data_key: str, stream: bool = False):
+    """
+    Decode one page of an SP-API response exactly once
+
+    Parameter:
+    - response: the requests response of the page
+    - data_key: key of the records inside the payload (ex. 'ItemData')
+    - stream: parse the body incrementally with ijson (the request must be sent with stream=True)
+
+    return:
+    - list of the records, the NextToken (None on the last page) and the errors (None if there is none)
+    """
+    if stream and ijson is not None and response.status_code == 200:
+        response.raw.decode_content = True
+        return _stream_page(response.raw, data_key)
+
+    data = loads(response.content)
+    payload = data.get('payload')
+    if payload is None:
+        return [], None, data.get('errors') or [{'message': 'Error: No payload in the response', 'details': ''}]
+
+    return payload.get(data_key, []), payload.get('NextToken'), data.get('errors')
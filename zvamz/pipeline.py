@@ -0,0 +1,376 @@
+"""
+Job file example:
+
+workers: 8
+per_account: 2
+processes: 2
+accounts:
+  acme:
+    username: acme
+    region: na
+jobs:
+  us_shipments:
+    pull: shipment_summary
+    account: acme
+    marketplace: US
+    args: {past_days: 30}
+  us_shipments_bq:
+    sink: bigquery
+    input: us_shipments
+    args: {table: project.dataset.shipments, dateName: date}
+  sp_campaign:
+    parse: spcreport
+    args: {filePath: exports/sp_campaign.csv}
+  sp_campaign_csv:
+    sink: csv
+    input: sp_campaign
+    after: [us_shipments_bq]
+    args: {path: out/sp_campaign.csv}
+"""
+import os
+import json
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from . import api
+from . import reports
+from .sinks import SINKS
+from .scheduler import AccountScheduler
+from .marketplaces import marketplaces
+
+PULLS = {
+    'shipment_status': api.shipment_status,
+    'shipment_items': api.shipment_items,
+    'shipment_summary': api.shipment_summary,
+    'narf_eligibility': api.narf_eligibility
+}
+
+PARSERS = {
+    'lowfeereport': reports.lowfeereport,
+    'promoreport': reports.promoreport,
+    'spstreport': reports.spstreport,
+    'sbstreport': reports.sbstreport,
+    'sdtreport': reports.sdtreport,
+    'spcreport': reports.spcreport,
+    'sbcreport': reports.sbcreport,
+    'sdcreport': reports.sdcreport
+}
+
+JOB_KINDS = ('pull', 'parse', 'sink')
+
+# job arguments holding a file or folder path
+PATH_ARGS = {'filePath', 'path', 'checkpoint_dir', 'indexPath', 'file_path_name'}
+
+
+def load_jobfile(path: str):
+    """
+    Read a job file (yaml or json)
+
+    Parameters:
+    - path: the path of the job file
+
+    Returns:
+    - dictionary of the job file
+    """
+    with open(path) as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        import yaml
+        return yaml.safe_load(f)
+
+
+def resolve_paths(config: dict, baseDir: str):
+    """
+    Make the relative paths of the job arguments absolute
+
+    Parameters:
+    - config: dictionary of the job file
+    - baseDir: folder the relative paths are relative to
+
+    Returns:
+    - a copy of config with absolute paths
+    """
+    config = dict(config)
+    jobs = {}
+    for name, spec in config.get('jobs', {}).items():
+        spec = dict(spec)
+        args = dict(spec.get('args', {}))
+        for key in PATH_ARGS & set(args):
+            if isinstance(args[key], str) and not os.path.isabs(args[key]):
+                args[key] = os.path.join(baseDir, args[key])
+        if args:
+            spec['args'] = args
+        jobs[name] = spec
+    config['jobs'] = jobs
+    return config
+
+
+class TokenCache:
+    """
+    Access token per account, requested once and shared by the jobs of the account.
+    Tokens are valid 1 hour, so they are requested again after maxAge seconds.
+    """
+    def __init__(self, accounts: dict, maxAge: float = 3000):
+        self.accounts = dict(accounts or {})
+        self.maxAge = maxAge
+        self.tokens = {}
+        self.lock = threading.Lock()
+        self.accountLocks = {}
+
+    def add_accounts(self, accounts: dict):
+        with self.lock:
+            for account, credentials in (accounts or {}).items():
+                if self.accounts.get(account) != credentials:
+                    self.accounts[account] = credentials
+                    self.tokens.pop(account, None)
+
+    def get(self, account: str):
+        if account not in self.accounts:
+            raise ValueError(f"Error: Unknown account {account}")
+        with self.lock:
+            accountLock = self.accountLocks.setdefault(account, threading.Lock())
+        with accountLock:
+            token, created = self.tokens.get(account, (None, 0))
+            if token is None or time.time() - created > self.maxAge:
+                token = api.zv_client_access(**self.accounts[account])
+                if isinstance(token, Exception):
+                    raise token
+                self.tokens[account] = (token, time.time())
+            return token
+
+
+class PipelineContext:
+    """
+    Worker pools, AccountScheduler (with the RateLimiter of every account) and TokenCache
+    used to run job files. The daemon keeps one alive across runs.
+    """
+    def __init__(self, workers: int = 4, processes: int = None, per_account: int = 2, accounts: dict = None):
+        """
+        Parameters:
+        - workers: number of threads for pulls and for sinks
+        - processes: number of processes for parsers, 0 runs them in the threads, defaults to the cpu count
+        - per_account: number of pulls running at the same time for one account
+        - accounts: dictionary of account name and zv_client_access arguments
+        """
+        processes = (os.cpu_count() or 1) if processes is None else processes
+        self.tokens = TokenCache(accounts)
+        self.threadPool = ThreadPoolExecutor(max_workers=workers)
+        self.scheduler = AccountScheduler(max_workers=workers, per_account=per_account)
+        self.processPool = None
+        if processes > 0:
+            # parser processes start while pull and sink threads run, forking a threaded process can deadlock
+            self.processPool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+
+    def close(self):
+        self.scheduler.shutdown(wait=True)
+        self.threadPool.shutdown(wait=True)
+        if self.processPool is not None:
+            self.processPool.shutdown(wait=True)
+
+
+def _job_kind(name: str, spec: dict):
+    kinds = [kind for kind in JOB_KINDS if kind in spec]
+    if len(kinds) != 1:
+        raise ValueError(f"Error: Job {name} needs exactly one of {', '.join(JOB_KINDS)}")
+    return kinds[0]
+
+
+def _dependencies(spec: dict):
+    deps = list(spec.get('after', []))
+    if 'input' in spec:
+        deps.append(spec['input'])
+    return deps
+
+
+def build_graph(jobs: dict):
+    """
+    Check the jobs and return their dependencies
+
+    Parameters:
+    - jobs: dictionary of job name and job spec
+
+    Returns:
+    - dictionary of job name and list of the jobs it waits for
+    - ValueError if a job is invalid or the dependencies have a cycle
+    """
+    graph = {}
+    for name, spec in jobs.items():
+        kind = _job_kind(name, spec)
+        target = spec[kind]
+        if kind == 'pull' and target not in PULLS:
+            raise ValueError(f"Error: Job {name} has unknown pull {target}")
+        if kind == 'parse' and target not in PARSERS:
+            raise ValueError(f"Error: Job {name} has unknown parser {target}")
+        if kind == 'sink':
+            if target not in SINKS:
+                raise ValueError(f"Error: Job {name} has unknown sink {target}")
+            if 'input' not in spec:
+                raise ValueError(f"Error: Sink job {name} needs an input job")
+
+        deps = _dependencies(spec)
+        for dep in deps:
+            if dep not in jobs:
+                raise ValueError(f"Error: Job {name} depends on unknown job {dep}")
+        graph[name] = deps
+
+    # Kahn's algorithm, anything left over is part of a cycle
+    remaining = {name: len(deps) for name, deps in graph.items()}
+    ready = [name for name, count in remaining.items() if count == 0]
+    while ready:
+        done = ready.pop()
+        del remaining[done]
+        for name, deps in graph.items():
+            if name in remaining and done in deps:
+                remaining[name] -= deps.count(done)
+                if remaining[name] == 0:
+                    ready.append(name)
+    if remaining:
+        raise ValueError(f"Error: Jobs have a dependency cycle: {', '.join(sorted(remaining))}")
+
+    return graph
+
+
+def _run_parser(parser: str, args: dict):
+    # module level so it can be sent to a worker process
+    return PARSERS[parser](**args)
+
+
+def _run_pull(spec: dict, tokens: TokenCache, rate_limiter=None):
+    args = dict(spec.get('args', {}))
+    if 'account' in spec:
+        args['access_token'] = tokens.get(spec['account'])
+    if 'marketplace' in spec:
+        args['marketplace_action'] = getattr(marketplaces, spec['marketplace'])
+    if rate_limiter is not None and spec['pull'] != 'narf_eligibility':
+        args['rate_limiter'] = rate_limiter
+    if 'account' in spec and spec['pull'] != 'narf_eligibility':
+        args.setdefault('checkpoint_account', spec['account'])
+    elif 'account' in spec:
+        args.setdefault('account', spec['account'])
+    return PULLS[spec['pull']](**args)
+
+
+def _run_sink(spec: dict, df):
+    if df is False:
+        print(f"Nothing to save: {spec['input']} has no data")
+        return 0
+    return SINKS[spec['sink']](df, **spec.get('args', {}))
+
+
+def run_pipeline(jobFile, workers: int = None, processes: int = None, only: list = None,
+                 context: PipelineContext = None):
+    """
+    Run the jobs of a job file as a dependency graph.
+    Pulls run in an AccountScheduler (one RateLimiter per account, fair across accounts),
+    sinks in a thread pool and parsers in a process pool,
+    so downloads and parsing overlap and a run takes about its critical path.
+
+    Parameters:
+    - jobFile: the path of the job file or the already loaded dictionary
+    - workers: number of threads for pulls and for sinks, overrides the job file
+    - processes: number of processes for parsers, 0 runs them in the threads, overrides the job file
+    - only: list of job names to run, their dependencies are added
+    - context: optional PipelineContext to reuse, workers and processes are then ignored
+
+    Returns:
+    - dictionary of job name and its status, seconds, rows and error
+    """
+    config = load_jobfile(jobFile) if isinstance(jobFile, (str, os.PathLike)) else jobFile
+    jobs = config.get('jobs', {})
+    graph = build_graph(jobs)
+
+    if only:
+        selected = set()
+        stack = list(only)
+        while stack:
+            name = stack.pop()
+            if name not in graph:
+                raise ValueError(f"Error: Unknown job {name}")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(graph[name])
+        graph = {name: deps for name, deps in graph.items() if name in selected}
+
+    ownContext = context is None
+    if ownContext:
+        context = PipelineContext(
+            workers=workers or config.get('workers', 4),
+            processes=config.get('processes') if processes is None else processes,
+            per_account=config.get('per_account', 2),
+            accounts=config.get('accounts')
+        )
+    else:
+        context.tokens.add_accounts(config.get('accounts'))
+
+    dependents = {name: 0 for name in graph}
+    for deps in graph.values():
+        for dep in deps:
+            dependents[dep] += 1
+
+    outputs = {}
+    status = {}
+    started = {}
+    running = {}
+    pending = dict(graph)
+
+    def release(name):
+        # drop outputs nobody is waiting for anymore
+        for dep in graph[name]:
+            dependents[dep] -= 1
+            if dependents[dep] == 0:
+                outputs.pop(dep, None)
+
+    try:
+        while pending or running:
+            for name, deps in list(pending.items()):
+                depStatus = [status.get(dep, {}).get('status') for dep in deps]
+                if any(s in ('failed', 'skipped') for s in depStatus):
+                    print(f"{name}: skipped, a dependency did not finish")
+                    status[name] = {'status': 'skipped', 'seconds': 0, 'rows': None, 'error': None}
+                    del pending[name]
+                    release(name)
+                    continue
+                if not all(s == 'done' for s in depStatus):
+                    continue
+
+                spec = jobs[name]
+                kind = _job_kind(name, spec)
+                if kind == 'parse' and context.processPool is not None:
+                    future = context.processPool.submit(_run_parser, spec['parse'], spec.get('args', {}))
+                elif kind == 'parse':
+                    future = context.threadPool.submit(_run_parser, spec['parse'], spec.get('args', {}))
+                elif kind == 'pull':
+                    future = context.scheduler.submit(spec.get('account'), _run_pull, spec, context.tokens)
+                else:
+                    future = context.threadPool.submit(_run_sink, spec, outputs[spec['input']])
+
+                print(f"{name}: started")
+                started[name] = time.perf_counter()
+                running[future] = name
+                del pending[name]
+
+            if not running:
+                continue
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                seconds = time.perf_counter() - started[name]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"{name}: failed after {seconds:.1f}s: {e}")
+                    status[name] = {'status': 'failed', 'seconds': seconds, 'rows': None, 'error': repr(e)}
+                else:
+                    rows = result if isinstance(result, int) else getattr(result, 'shape', (None,))[0]
+                    print(f"{name}: done in {seconds:.1f}s")
+                    status[name] = {'status': 'done', 'seconds': seconds, 'rows': rows, 'error': None}
+                    if dependents[name] > 0:
+                        outputs[name] = result
+                release(name)
+    finally:
+        if ownContext:
+            context.close()
+
+    return status
@@ -0,0 +1,114 @@
+import os
+import time
+import tracemalloc
+
+
+def _memory():
+    """
+    Current memory of the process in bytes: traced memory when tracemalloc is running,
+    otherwise the resident set size (linux only, None elsewhere)
+    """
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _Stage:
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+        self.rows = None
+
+    def __enter__(self):
+        self.memory = _memory()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        memory = _memory()
+        self.profile.stages.append({
+            'parser': self.profile.parser,
+            'stage': self.name,
+            'seconds': seconds,
+            'rows': self.rows,
+            'mem_delta_mb': (memory - self.memory) / 1024 ** 2 if memory is not None and self.memory is not None else None
+        })
+
+
+class _NoStage:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class ParseProfile:
+    """
+    Wall time, rows and memory delta of every stage of a report function
+    (read, rename, clean, dates, astype)
+    """
+    def __init__(self, callback=None):
+        """
+        Parameters:
+        - callback: optional function called with the profile once the report function is done
+        """
+        self.callback = callback
+        self.parser = None
+        self.stages = []
+
+    def stage(self, name: str):
+        return _Stage(self, name)
+
+    def finish(self):
+        if self.callback is not None:
+            self.callback(self)
+
+    @property
+    def seconds(self):
+        return sum(stage['seconds'] for stage in self.stages)
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.stages, columns=['parser', 'stage', 'seconds', 'rows', 'mem_delta_mb'])
+
+    def __repr__(self):
+        lines = [f"{self.parser}: {self.seconds:.3f}s"]
+        for stage in self.stages:
+            memory = '' if stage['mem_delta_mb'] is None else f", {stage['mem_delta_mb']:+.1f}MB"
+            lines.append(f"  {stage['stage']}: {stage['seconds']:.3f}s, {stage['rows']} rows{memory}")
+        return '\n'.join(lines)
+
+
+class _NoProfile:
+    def stage(self, name: str):
+        return _NoStage()
+
+    def finish(self):
+        pass
+
+
+def parse_profiler(profile, parser: str):
+    """
+    Profiler used inside a report function
+
+    Parameters:
+    - profile: None, a ParseProfile to fill, or a function called with the ParseProfile at the end
+    - parser: name of the report function
+
+    Returns:
+    - object with stage(name) and finish()
+    """
+    if profile is None:
+        return _NoProfile()
+    if not isinstance(profile, ParseProfile):
+        profile = ParseProfile(callback=profile)
+    profile.parser = parser
+    return profile
@@ -0,0 +1,117 @@
+import datetime
+import numpy as np
+import pandas as pd
+from .dtypes import read_options
+
+
+def _date_only(value):
+    # '2026-09-10' or date(2026, 9, 10), not '2026-09-10 00:00' or datetime(2026, 9, 10)
+    if isinstance(value, str):
+        return len(value.strip()) <= 10
+    return isinstance(value, datetime.date) and not isinstance(value, datetime.datetime)
+
+
+def _bound(value, utc: bool):
+    if value is None:
+        return None
+    value = pd.Timestamp(value)
+    if utc and value.tzinfo is None:
+        return value.tz_localize('UTC')
+    return value
+
+
+def read_header(filePath: str, csv: bool = False):
+    """
+    Column names of a report without reading its rows
+    """
+    if csv:
+        return list(pd.read_csv(filePath, nrows=0).columns)
+    return list(pd.read_excel(filePath, nrows=0).columns)
+
+
+def read_report(filePath: str, columnName, csv: bool = False, dtype_backend: str = None,
+                columns: list = None, dateColumn: str = None, dateRange=None, campaigns: list = None,
+                utc: bool = False, chunkRows: int = 100000):
+    """
+    Read a report, keeping only the requested columns and rows.
+    Columns are dropped by the reader itself (usecols) and rows are filtered on the raw values,
+    before the numbers are cleaned and the columns coerced to the report schema.
+    Csv files read by the default engine are filtered chunk by chunk, so the rows
+    outside of the filters are never held in memory all together.
+
+    Parameters:
+    - filePath: the path where the report is saved
+    - columnName: function turning a raw column name into its cleaned name
+    - csv: True for csv reports, False for excel reports
+    - dtype_backend: 'pyarrow' to keep the columns pyarrow backed, None for numpy/object columns
+    - columns: list of cleaned column names to keep, defaults to all of them
+    - dateColumn: cleaned name of the date column used by dateRange
+    - dateRange: (start, end) dates to keep, both included, either can be None.
+      An end without a time part (ex. '2026-09-10') keeps the whole day
+    - campaigns: list of campaign names to keep (campaign_name column)
+    - utc: the dates of the report are UTC timestamps
+    - chunkRows: rows per chunk when a csv file is filtered while reading
+
+    Returns:
+    - DataFrame with the raw column names
+    - list of the cleaned names of every column of the report, in file order
+    """
+    options = read_options(dtype_backend, csv=csv)
+    if columns is None and dateRange is None and campaigns is None:
+        df = pd.read_csv(filePath, **options) if csv else pd.read_excel(filePath, **options)
+        return df, [columnName(col) for col in df.columns]
+
+    rawColumns = read_header(filePath, csv)
+    header = [columnName(col) for col in rawColumns]
+    rawNames = dict(zip(header, rawColumns))
+
+    filterColumns = []
+    if dateRange is not None:
+        if dateColumn is None:
+            raise ValueError("Error: This report can not be filtered by date")
+        filterColumns.append(dateColumn)
+    if campaigns is not None:
+        filterColumns.append('campaign_name')
+
+    keep = header if columns is None else list(columns)
+    missing = [col for col in keep + filterColumns if col not in rawNames]
+    if missing:
+        raise ValueError(f"Error: Unknown columns {missing}")
+    needed = set(keep) | set(filterColumns)
+    options['usecols'] = [rawNames[col] for col in header if col in needed]
+
+    def rowFilter(df):
+        mask = np.ones(len(df), dtype=bool)
+        if dateRange is not None:
+            start, end = (_bound(value, utc) for value in dateRange)
+            dates = pd.to_datetime(df[rawNames[dateColumn]], utc=utc)
+            if start is not None:
+                mask &= (dates >= start).to_numpy(dtype=bool, na_value=False)
+            if end is not None and _date_only(dateRange[1]):
+                # timestamps of the end day are before the start of the next day
+                mask &= (dates < end + pd.Timedelta(days=1)).to_numpy(dtype=bool, na_value=False)
+            elif end is not None:
+                mask &= (dates <= end).to_numpy(dtype=bool, na_value=False)
+        if campaigns is not None:
+            mask &= df[rawNames['campaign_name']].isin(list(campaigns)).to_numpy(dtype=bool)
+        return df[mask]
+
+    if csv and options.get('engine') != 'pyarrow' and (dateRange is not None or campaigns is not None):
+        chunks = [rowFilter(chunk) for chunk in pd.read_csv(filePath, chunksize=chunkRows, **options)]
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.read_csv(filePath, nrows=0, **options)
+    else:
+        df = pd.read_csv(filePath, **options) if csv else pd.read_excel(filePath, **options)
+        df = rowFilter(df).reset_index(drop=True)
+
+    # the filter only columns are dropped here
+    return df[[rawNames[col] for col in header if col in keep]], header
+
+
+def project_schema(schema: dict, df: pd.DataFrame, columns: list = None):
+    """
+    The part of a report schema matching the columns that were read
+    (the whole schema when no columns were requested, so missing columns still raise)
+    """
+    if columns is None:
+        return schema
+    return {col: dtype for col, dtype in schema.items() if col in df.columns}
@@ -1,7 +1,6 @@
 import time
 import threading
 import datetime
-import requests
 
 class RateLimiter:
     def __init__(self, tokens_per_second, capacity):
@@ -35,6 +34,8 @@ class RateLimiter:
 
     def send_request(self, action, *args, **kwargs):
         """Send a request, handling throttling."""
+        import requests
+
         while not self.allow_request():
             time.sleep(1)
 
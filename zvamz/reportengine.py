@@ -0,0 +1,213 @@
+import os
+import json
+import gzip
+import hashlib
+import time
+import threading
+import requests
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+
+REPORTS_PATH = '/reports/2021-06-30'
+
+
+class ReportEngine:
+    """
+    Get the document of an SP-API report while creating as few reports as possible:
+    - a recent DONE (or still running) report of the same type, marketplaces and options is reused
+    - identical requests made at the same time share one report
+    """
+    def __init__(self, maxAge: float = 3600, pollSeconds: float = 60, registryPath: str = None):
+        """
+        Parameters:
+        - maxAge: seconds a report can be reused after it was created, 0 always creates a new one
+        - pollSeconds: seconds between two report status checks
+        - registryPath: optional json file to remember the options of the created reports across runs
+        """
+        self.maxAge = maxAge
+        self.pollSeconds = pollSeconds
+        self.registryPath = registryPath
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.registry = {}
+        self.session = requests.Session()
+
+        if registryPath and os.path.exists(registryPath):
+            with open(registryPath) as f:
+                self.registry = json.load(f)
+
+    def _remember(self, reportId: str, reportOptions: dict):
+        # the reports list does not return reportOptions, so keep them for the reports we create
+        with self.lock:
+            self.registry[reportId] = {'options': reportOptions or {}, 'created': time.time()}
+            self.registry = {key: value for key, value in self.registry.items()
+                             if time.time() - value['created'] < max(self.maxAge, 86400)}
+            if self.registryPath:
+                tempPath = self.registryPath + '.tmp'
+                with open(tempPath, 'w') as f:
+                    json.dump(self.registry, f)
+                os.replace(tempPath, self.registryPath)
+
+    def _find_recent(self, regionUrl, headers, reportType, marketplaceIds, reportOptions,
+                     dataStartTime, dataEndTime):
+        """
+        Returns:
+        - id of a reusable report, DONE ones first, or None
+        """
+        if self.maxAge <= 0:
+            return None
+
+        createdSince = (datetime.now(timezone.utc) - timedelta(seconds=self.maxAge)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        request_params = {
+            'reportTypes': reportType,
+            'marketplaceIds': ','.join(marketplaceIds),
+            'processingStatuses': 'DONE,IN_QUEUE,IN_PROGRESS',
+            'createdSince': createdSince,
+            'pageSize': 100
+        }
+        response = self.session.get(regionUrl + REPORTS_PATH + '/reports', headers=headers, params=request_params)
+        if response.status_code != 200:
+            print("Could not list the recent reports:", response.text)
+            return None
+
+        candidates = []
+        for report in response.json().get('reports', []):
+            if set(report.get('marketplaceIds', [])) != set(marketplaceIds):
+                continue
+            if dataStartTime and report.get('dataStartTime') != dataStartTime:
+                continue
+            if dataEndTime and report.get('dataEndTime') != dataEndTime:
+                continue
+            known = self.registry.get(report['reportId'])
+            if reportOptions and (known is None or known['options'] != reportOptions):
+                continue
+            if not reportOptions and known is not None and known['options']:
+                continue
+            candidates.append(report)
+
+        candidates.sort(key=lambda report: (report['processingStatus'] == 'DONE', report.get('createdTime', '')),
+                        reverse=True)
+        if candidates:
+            print(f"Reusing report {candidates[0]['reportId']} ({candidates[0]['processingStatus']})")
+            return candidates[0]['reportId']
+        return None
+
+    def _create(self, regionUrl, headers, reportType, marketplaceIds, reportOptions, dataStartTime, dataEndTime):
+        request_params = {
+            'marketplaceIds': marketplaceIds,
+            'reportType': reportType
+        }
+        if reportOptions:
+            request_params['reportOptions'] = reportOptions
+        if dataStartTime:
+            request_params['dataStartTime'] = dataStartTime
+        if dataEndTime:
+            request_params['dataEndTime'] = dataEndTime
+
+        create_response = self.session.post(regionUrl + REPORTS_PATH + '/reports', headers=headers, json=request_params)
+        if create_response.status_code not in (200, 202):
+            raise ValueError(f"Error: Report creation failed: {create_response.text}")
+        reportId = create_response.json()['reportId']
+        self._remember(reportId, reportOptions)
+        return reportId
+
+    def _wait(self, regionUrl, headers, reportId):
+        url = regionUrl + REPORTS_PATH + f'/reports/{reportId}'
+        while True:
+            status_response = self.session.get(url, headers=headers).json()
+            status = status_response.get("processingStatus")
+
+            if status == "DONE":
+                print("Report is ready for download!")
+                return status_response["reportDocumentId"]
+            elif status == "CANCELLED":
+                raise ValueError("Error: Report creation was cancelled.")
+            elif status in ("FATAL", "FAILED"):
+                raise ValueError("Error: Report creation failed.")
+            else:
+                print(f"Report status: {status}. Waiting for report to be ready...")
+                time.sleep(self.pollSeconds)
+
+    def _download(self, regionUrl, headers, documentId):
+        document_response = self.session.get(regionUrl + REPORTS_PATH + f'/documents/{documentId}', headers=headers)
+        if document_response.status_code != 200:
+            raise ValueError(f"Error: Failed to get the report document: {document_response.text}")
+
+        document = document_response.json()
+        content = self.session.get(document["url"]).content
+        if document.get('compressionAlgorithm') == 'GZIP':
+            content = gzip.decompress(content)
+        return content
+
+    def _acquire(self, regionUrl, access_token, reportType, marketplaceIds, reportOptions, dataStartTime, dataEndTime):
+        headers = {
+            'x-amz-access-token': access_token,
+            'Content-Type': 'application/json'
+        }
+        reportId = self._find_recent(regionUrl, headers, reportType, marketplaceIds, reportOptions,
+                                     dataStartTime, dataEndTime)
+        if reportId is None:
+            reportId = self._create(regionUrl, headers, reportType, marketplaceIds, reportOptions,
+                                    dataStartTime, dataEndTime)
+        documentId = self._wait(regionUrl, headers, reportId)
+        return self._download(regionUrl, headers, documentId)
+
+    def document(self, regionUrl: str, access_token: str, reportType: str, marketplaceIds: list,
+                 reportOptions: dict = None, dataStartTime: str = None, dataEndTime: str = None,
+                 account: str = None):
+        """
+        Get the content of a report document, reusing a recent report or a request already in flight
+
+        Parameters:
+        - regionUrl: the SP-API region url (first value of a marketplaces command)
+        - access_token: matching access token of the marketplace
+        - reportType: the report type (ex. 'GET_REMOTE_FULFILLMENT_ELIGIBILITY')
+        - marketplaceIds: list of marketplace ids
+        - reportOptions: optional dictionary of report options
+        - dataStartTime, dataEndTime: optional ISO 8601 data range of the report
+        - account: name of the seller account, defaults to a hash of access_token.
+          Only requests of the same account share a report.
+
+        Returns:
+        - bytes of the report document (decompressed)
+        """
+        # two sellers asking for the same report must never get each other's document
+        account = account or hashlib.sha256(access_token.encode()).hexdigest()[:16]
+        key = json.dumps([account, regionUrl, reportType, sorted(marketplaceIds), reportOptions or {},
+                          dataStartTime, dataEndTime], sort_keys=True)
+
+        with self.lock:
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.inflight[key] = future
+
+        if not leader:
+            print(f"Waiting for the {reportType} report already requested")
+            return future.result()
+
+        try:
+            future.set_result(self._acquire(regionUrl, access_token, reportType, marketplaceIds, reportOptions,
+                                            dataStartTime, dataEndTime))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self.lock:
+                del self.inflight[key]
+
+        return future.result()
+
+
+default_engine = ReportEngine()
+
+
+def acquire_report(regionUrl: str, access_token: str, reportType: str, marketplaceIds: list,
+                   reportOptions: dict = None, dataStartTime: str = None, dataEndTime: str = None,
+                   account: str = None):
+    """
+    Get the content of a report document with the shared ReportEngine of the process.
+    See ReportEngine.document for the parameters.
+    """
+    return default_engine.document(regionUrl, access_token, reportType, marketplaceIds,
+                                   reportOptions, dataStartTime, dataEndTime, account)
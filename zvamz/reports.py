@@ -1,5 +1,287 @@
+import numbers
 import pandas as pd
 from datetime import datetime
+from .dtypes import backend_schema, strip_symbols
+from .pushdown import read_header, read_report, project_schema
+from .profiling import parse_profiler
+
+
+LOWFEE_SCHEMA = {
+    'start_date': 'datetime64[ns]',
+    'end_date': 'datetime64[ns]',
+    'asin': str,
+    'msku': str,
+    'low_inventory_level_fee_per_unit': float,
+    'low_inventory_level_fee_quantity': float,
+    'low_inventory_level_fee_total': float
+}
+
+PROMO_SCHEMA = {
+    'shipment_date': 'datetime64[ns, UTC]',
+    'currency': str,
+    'item_promotion_discount': float,
+    'item_promotion_id': str,
+    'description': str,
+    'promotion_rule_value': str,
+    'amazon_order_id': str,
+    'shipment_id': str,
+    'shipment_item_id': str
+}
+
+SPST_SCHEMA = {
+    'date': 'datetime64[ns]',
+    'portfolio_name': str,
+    'currency': str,
+    'campaign_name': str,
+    'ad_group_name': str,
+    'targeting': str,
+    'match_type': str,
+    'customer_search_term': str,
+    'impressions': float,
+    'clicks': float,
+    'clickthru_rate_ctr': float,
+    'cost_per_click_cpc': float,
+    'spend': float,
+    '_7_day_total_sales_': float,
+    'total_advertising_cost_of_sales_acos_': float,
+    'total_return_on_advertising_spend_roas': float,
+    '_7_day_total_orders_': float,
+    '_7_day_total_units_': float,
+    '_7_day_conversion_rate': float,
+    '_7_day_advertised_sku_units_': float,
+    '_7_day_other_sku_units_': float,
+    '_7_day_advertised_sku_sales_': float,
+    '_7_day_other_sku_sales_': float
+}
+
+SBST_SCHEMA = {
+    'date': 'datetime64[ns]',
+    'portfolio_name': str,
+    'currency': str,
+    'campaign_name': str,
+    'ad_group_name': str,
+    'targeting': str,
+    'match_type': str,
+    'customer_search_term': str,
+    'cost_type': str,
+    'impressions': float,
+    'viewable_impressions': float,
+    'clicks': float,
+    'clickthru_rate_ctr': float,
+    'spend': float,
+    'cost_per_click_cpc': float,
+    'cost_per_1000_viewable_impressions_vcpm': float,
+    'total_advertising_cost_of_sales_acos_': float,
+    'total_return_on_advertising_spend_roas': float,
+    '_14_day_total_sales_': float,
+    '_14_day_total_orders_': float,
+    '_14_day_total_units_': float,
+    '_14_day_conversion_rate': float,
+    'total_advertising_cost_of_sales_acos__click': float,
+    'total_return_on_advertising_spend_roas__click': float,
+    '_14_day_total_sales__click': float,
+    '_14_day_total_orders___click': float,
+    '_14_day_total_units___click': float
+}
+
+SDT_SCHEMA = {
+    'date': 'datetime64[ns]',
+    'currency': str,
+    'campaign_name': str,
+    'portfolio_name': str,
+    'cost_type': str,
+    'ad_group_name': str,
+    'targeting': str,
+    'bid_optimization': str,
+    'impressions': float,
+    'viewable_impressions': float,
+    'clicks': float,
+    'clickthru_rate_ctr': float,
+    '_14_day_detail_page_views_dpv': float,
+    'spend': float,
+    'cost_per_click_cpc': float,
+    'cost_per_1000_viewable_impressions_vcpm': float,
+    'total_advertising_cost_of_sales_acos_': float,
+    'total_return_on_advertising_spend_roas': float,
+    '_14_day_total_orders_': float,
+    '_14_day_total_units_': float,
+    '_14_day_total_sales_': float,
+    '_14_day_newtobrand_orders_': float,
+    '_14_day_newtobrand_sales': float,
+    '_14_day_newtobrand_units_': float,
+    'total_advertising_cost_of_sales_acos__click': float,
+    'total_return_on_advertising_spend_roas__click': float,
+    '_14_day_total_orders___click': float,
+    '_14_day_total_units___click': float,
+    '_14_day_total_sales__click': float,
+    '_14_day_newtobrand_orders___click': float,
+    '_14_day_newtobrand_sales__click': float,
+    '_14_day_newtobrand_units___click': float
+}
+
+SPC_SCHEMA = {
+    'date': 'datetime64[ns]',
+    'portfolio_name': str,
+    'campaign_type': str,
+    'campaign_name': str,
+    'country': str,
+    'status': str,
+    'currency': str,
+    'budget': float,
+    'targeting_type': str,
+    'bidding_strategy': str,
+    'impressions': float,
+    'last_year_impressions': float,
+    'clicks': float,
+    'last_year_clicks': float,
+    'clickthru_rate_ctr': float,
+    'spend': float,
+    'last_year_spend': float,
+    'cost_per_click_cpc': float,
+    'last_year_cost_per_click_cpc': float,
+    '_7_day_total_orders_': float,
+    'total_advertising_cost_of_sales_acos_': float,
+    'total_return_on_advertising_spend_roas': float,
+    '_7_day_total_sales_': float
+}
+
+SBC_SCHEMA = {
+    'date': 'datetime64[ns]',
+    'portfolio_name': str,
+    'currency': str,
+    'campaign_name': str,
+    'cost_type': str,
+    'country': str,
+    'impressions': float,
+    'clicks': float,
+    'clickthru_rate_ctr': float,
+    'cost_per_click_cpc': float,
+    'spend': float,
+    'total_advertising_cost_of_sales_acos_': float,
+    'total_return_on_advertising_spend_roas': float,
+    '_14_day_total_sales_': float,
+    '_14_day_total_orders_': float,
+    '_14_day_total_units_': float,
+    '_14_day_conversion_rate': float,
+    'viewable_impressions': float,
+    'cost_per_1000_viewable_impressions_vcpm': float,
+    'viewthrough_rate_vtr': float,
+    'clickthrough_rate_for_views_vctr': float,
+    'video_first_quartile_views': float,
+    'video_midpoint_views': float,
+    'video_third_quartile_views': float,
+    'video_complete_views': float,
+    'video_unmutes': float,
+    '_5_second_views': float,
+    '_5_second_view_rate': float,
+    '_14_day_branded_searches': float,
+    '_14_day_detail_page_views_dpv': float,
+    '_14_day_newtobrand_orders_': float,
+    '_14_day_%_of_orders_newtobrand': float,
+    '_14_day_newtobrand_sales': float,
+    '_14_day_%_of_sales_newtobrand': float,
+    '_14_day_newtobrand_units_': float,
+    '_14_day_%_of_units_newtobrand': float,
+    '_14_day_newtobrand_order_rate': float,
+    'total_advertising_cost_of_sales_acos__click': float,
+    'total_return_on_advertising_spend_roas__click': float,
+    '_14_day_total_sales__click': float,
+    '_14_day_total_orders___click': float,
+    '_14_day_total_units___click': float,
+    'newtobrand_detail_page_views': float,
+    'newtobrand_detail_page_view_clickthrough_conversions': float,
+    'newtobrand_detail_page_view_rate': float,
+    'effective_cost_per_newtobrand_detail_page_view': float,
+    '_14_day_atc': float,
+    '_14_day_atc_clicks': float,
+    '_14_day_atcr': float,
+    'effective_cost_per_add_to_cart_ecpatc': float,
+    'branded_searches_clickthrough_conversions': float,
+    'branded_searches_rate': float,
+    'effective_cost_per_branded_search': float
+}
+
+SDC_SCHEMA = {
+    'date': 'datetime64[ns]',
+    'country': str,
+    'status': str,
+    'currency': str,
+    'budget': float,
+    'campaign_name': str,
+    'portfolio_name': str,
+    'cost_type': str,
+    'impressions': float,
+    'viewable_impressions': float,
+    'clicks': float,
+    'clickthru_rate_ctr': float,
+    '_14_day_detail_page_views_dpv': float,
+    'spend': float,
+    'cost_per_click_cpc': float,
+    'cost_per_1000_viewable_impressions_vcpm': float,
+    'total_advertising_cost_of_sales_acos_': float,
+    'total_return_on_advertising_spend_roas': float,
+    '_14_day_total_orders_': float,
+    '_14_day_total_units_': float,
+    '_14_day_total_sales_': float,
+    '_14_day_newtobrand_orders_': float,
+    '_14_day_newtobrand_sales': float,
+    '_14_day_newtobrand_units_': float,
+    'total_advertising_cost_of_sales_acos__click': float,
+    'total_return_on_advertising_spend_roas__click': float,
+    '_14_day_total_orders___click': float,
+    '_14_day_total_units___click': float,
+    '_14_day_total_sales__click': float,
+    '_14_day_newtobrand_orders___click': float,
+    '_14_day_newtobrand_sales__click': float,
+    '_14_day_newtobrand_units___click': float,
+    'newtobrand_detail_page_views': float,
+    'newtobrand_detail_page_view_viewthrough_conversions': float,
+    'newtobrand_detail_page_view_clickthrough_conversions': float,
+    'newtobrand_detail_page_view_rate': float,
+    'effective_cost_per_newtobrand_detail_page_view': float,
+    '_14_day_atc': float,
+    '_14_day_atc_views': float,
+    '_14_day_atc_clicks': float,
+    '_14_day_atcr': float,
+    'effective_cost_per_add_to_cart_ecpatc': float,
+    '_14_day_branded_searches': float,
+    'branded_searches_viewthrough_conversions': float,
+    'branded_searches_clickthrough_conversions': float,
+    'branded_searches_rate': float,
+    'effective_cost_per_branded_search': float
+}
+
+
+def _lowfee_column(x):
+    return x.replace('-','_').replace(' ','_').lower()
+
+
+def _promo_column(x):
+    return x.replace('?','').replace('"','').replace('-','_').lower()
+
+
+def _spst_column(X):
+    return X.replace('7','_7').replace('-','').replace('#','').replace('(','').replace(')','').replace(' ','_').lower()
+
+
+def _sbst_column(X):
+    return X.replace('14','_14').replace('-','').replace('#','').replace('(','').replace(')','').replace(',','').replace(' ','_').lower()
+
+
+def _sdt_column(X):
+    return X.replace('14','_14').replace('-','').replace('#','').replace('(','').replace(')','').replace(',','').replace(' ','_').lower()
+
+
+def _spc_column(X):
+    return X.replace('7','_7').replace('-','').replace('#','').replace('(','').replace(')','').replace(',','').replace(' ','_').lower()
+
+
+def _sbc_column(X):
+    return X.replace('14','_14').replace('5','_5').replace('-','').replace('#','').replace('(','').replace(')','').replace(',','').replace(' ','_').lower()
+
+
+def _sdc_column(X):
+    return X.replace('14','_14').replace('-','').replace('#','').replace('(','').replace(')','').replace(',','').replace(' ','_').lower()
 
 
 def bgdeldup(dateName:str, minDate: datetime, client: str, bgTable:str):
@@ -57,6 +339,58 @@ def bgdeldupf(dateName:str, minDate: datetime, client: str, bgTable:str):
     return delData
 
 
+def bgdelkeys(keysDf: pd.DataFrame, client: str, bgTable: str, chunkSize: int = 500, free: bool = False):
+    """
+    Delete the rows matching the given keys, used by the delta upload
+    so only the changed rows are replaced
+
+    Parameters:
+    - keysDf: DataFrame of the key columns to delete
+    - client: the BigQuery client name
+    - bgTable: the BigQuery Table address
+    - chunkSize: number of keys per DELETE statement
+    - free: rewrite the table without the keys (free version of BigQuery, no DML) like bgdeldupf
+
+    Returns:
+    - number of keys deleted
+    """
+    def literal(value):
+        if isinstance(value, numbers.Real) and not isinstance(value, bool):
+            return str(value)
+        return "'" + str(value).replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+    columns = list(keysDf.columns)
+    for start in range(0, len(keysDf), chunkSize):
+        chunk = keysDf.iloc[start:start + chunkSize]
+        conditions = []
+        for row in chunk.itertuples(index=False):
+            conditions.append('(' + ' AND '.join(
+                f'{col} IS NULL' if pd.isna(value) else f'{col} = {literal(value)}'
+                for col, value in zip(columns, row)
+            ) + ')')
+
+        if free:
+            # IFNULL keeps the rows whose key comparison is NULL
+            delDataQuery = f"""
+    CREATE OR REPLACE TABLE `{bgTable}` AS
+    SELECT *
+    FROM `{bgTable}`
+    WHERE
+    NOT IFNULL({' OR '.join(conditions)}, FALSE)
+    """
+        else:
+            delDataQuery = f"""
+    DELETE FROM
+    `{bgTable}`
+    WHERE
+    {' OR '.join(conditions)}
+    """
+
+        client.query(delDataQuery).result()
+
+    return len(keysDf)
+
+
 def dfbgcolcheck(df: pd.DataFrame, client: str, bgTable: str):
     """
     This function compares the columns of DataFrame and existing BigQuery Table
@@ -88,19 +422,24 @@ def dfbgcolcheck(df: pd.DataFrame, client: str, bgTable: str):
         raise ValueError("Error: Column names and positions are not the same.")
 
 
-def lowfeereport(filePath:str):
+def lowfeereport(filePath:str, dtype_backend:str=None, profile=None,
+                 columns:list=None, dateRange=None):
     """
     This function process and clean the Amazon Economics Report.
     It extracts the low level inventory data
 
     Paremeters:
     - filePath: the path where the report is saved
+    - dtype_backend: 'pyarrow' to keep the columns pyarrow backed, None for numpy/object columns
+    - profile: optional ParseProfile to fill, or function called with it, to time every stage
+    - columns: optional list of cleaned column names to read, the other columns are never parsed
+    - dateRange: optional (start, end) of the dates to keep, applied while reading
 
     Returns:
     - DataFrame of the cleaned report
     - Flase if there is no data related to low level inventory fee
     """
-    lowFeeDf = pd.read_csv(filePath)
+    profiler = parse_profiler(profile, 'lowfeereport')
 
     checkCol = [
         'Low-inventory-level fee per unit',
@@ -108,348 +447,221 @@ def lowfeereport(filePath:str):
         'Low-inventory-level fee total'
     ]
 
-    colCheck = all(col in lowFeeDf.columns for col in checkCol)
+    # the economics report has many more columns, check the header before reading any row
+    colCheck = all(col in read_header(filePath, csv=True) for col in checkCol)
 
     if colCheck:
-        lowFeeDf = lowFeeDf[[
-            'Start date',
-            'End date',
-            'ASIN',
-            'MSKU',
-            'Low-inventory-level fee per unit',
-            'Low-inventory-level fee quantity',
-            'Low-inventory-level fee total'
-        ]]
-
-        lowFeeDf = lowFeeDf.rename(columns=lambda x:x.replace('-','_').replace(' ','_').lower())
-        lowFeeDf['start_date'] = pd.to_datetime(lowFeeDf['start_date'])
-        lowFeeDf['end_date'] = pd.to_datetime(lowFeeDf['end_date'])
-
-        schema = {
-                'start_date': 'datetime64[ns]',
-                'end_date': 'datetime64[ns]',
-                'asin': str,
-                'msku': str,
-                'low_inventory_level_fee_per_unit': float,
-                'low_inventory_level_fee_quantity': float,
-                'low_inventory_level_fee_total': float
-        }
-
-        lowFeeDf = lowFeeDf.astype(schema)
+        with profiler.stage('read') as stage:
+            lowFeeDf, header = read_report(filePath, _lowfee_column, True, dtype_backend,
+                                          list(LOWFEE_SCHEMA) if columns is None else columns,
+                                          'start_date', dateRange, None)
+            stage.rows = len(lowFeeDf)
+
+        with profiler.stage('rename') as stage:
+            lowFeeDf = lowFeeDf.rename(columns=_lowfee_column)
+            stage.rows = len(lowFeeDf)
+
+        with profiler.stage('dates') as stage:
+            for col in ['start_date', 'end_date']:
+                if col in lowFeeDf.columns:
+                    lowFeeDf[col] = pd.to_datetime(lowFeeDf[col])
+            stage.rows = len(lowFeeDf)
+
+        with profiler.stage('astype') as stage:
+            lowFeeDf = lowFeeDf.astype(backend_schema(project_schema(LOWFEE_SCHEMA, lowFeeDf, columns), dtype_backend))
+            stage.rows = len(lowFeeDf)
+
+        profiler.finish()
         return lowFeeDf
     else:
+        profiler.finish()
         return False
     
 
-def promoreport(filePath:str):
+def promoreport(filePath:str, dtype_backend:str=None, profile=None,
+                columns:list=None, dateRange=None):
     """
     Clean the raw file downloaded in Amazon Seller Central Promotions Report
 
     Parameter:
     - filePath: the path where the downloaded Promotions Report is located
+    - dtype_backend: 'pyarrow' to keep the columns pyarrow backed, None for numpy/object columns
+    - profile: optional ParseProfile to fill, or function called with it, to time every stage
+    - columns: optional list of cleaned column names to read, the other columns are never parsed
+    - dateRange: optional (start, end) of the dates to keep, applied while reading
 
     Return:
     - DataFrame of the cleaned report
     """
-    promoDf = pd.read_csv(filePath)
-    promoDf = promoDf.rename(columns=lambda x:x.replace('?','').replace('"','').replace('-','_').lower())
-    promoDf['shipment_date'] = pd.to_datetime(promoDf['shipment_date'], utc=True)
-
-    schema = {
-        'shipment_date': 'datetime64[ns, UTC]',
-        'currency': str,
-        'item_promotion_discount': float,
-        'item_promotion_id': str,
-        'description': str,
-        'promotion_rule_value': str,
-        'amazon_order_id': str,
-        'shipment_id': str,
-        'shipment_item_id': str
-    }
-    promoDf = promoDf.astype(schema)
+    profiler = parse_profiler(profile, 'promoreport')
+
+    with profiler.stage('read') as stage:
+        promoDf, header = read_report(filePath, _promo_column, True, dtype_backend, columns,
+                                     'shipment_date', dateRange, None, utc=True)
+        stage.rows = len(promoDf)
+
+    with profiler.stage('rename') as stage:
+        promoDf = promoDf.rename(columns=_promo_column)
+        stage.rows = len(promoDf)
 
+    with profiler.stage('dates') as stage:
+        if 'shipment_date' in promoDf.columns:
+            promoDf['shipment_date'] = pd.to_datetime(promoDf['shipment_date'], utc=True)
+        stage.rows = len(promoDf)
+
+    with profiler.stage('astype') as stage:
+        promoDf = promoDf.astype(backend_schema(project_schema(PROMO_SCHEMA, promoDf, columns), dtype_backend))
+        stage.rows = len(promoDf)
+
+    profiler.finish()
     return promoDf
 
-def spstreport(filePath:str):
-    spSearchTermDf = pd.read_excel(filePath)
-    spSearchTermDf = spSearchTermDf.rename(columns=lambda X:X.replace('7','_7').replace('-','').replace('#','').replace('(','').replace(')','').replace(' ','_').lower())
-
-    schema = {
-        'date': 'datetime64[ns]',
-        'portfolio_name': str,
-        'currency': str,
-        'campaign_name': str,
-        'ad_group_name': str,
-        'targeting': str,
-        'match_type': str,
-        'customer_search_term': str,
-        'impressions': float,
-        'clicks': float,
-        'clickthru_rate_ctr': float,
-        'cost_per_click_cpc': float,
-        'spend': float,
-        '_7_day_total_sales_': float,
-        'total_advertising_cost_of_sales_acos_': float,
-        'total_return_on_advertising_spend_roas': float,
-        '_7_day_total_orders_': float,
-        '_7_day_total_units_': float,
-        '_7_day_conversion_rate': float,
-        '_7_day_advertised_sku_units_': float,
-        '_7_day_other_sku_units_': float,
-        '_7_day_advertised_sku_sales_': float,
-        '_7_day_other_sku_sales_': float
-    }
-
-    spSearchTermDf = spSearchTermDf.astype(schema)
+def spstreport(filePath:str, dtype_backend:str=None, profile=None,
+               columns:list=None, dateRange=None, campaigns:list=None):
+    profiler = parse_profiler(profile, 'spstreport')
+
+    with profiler.stage('read') as stage:
+        spSearchTermDf, header = read_report(filePath, _spst_column, False, dtype_backend, columns,
+                                            'date', dateRange, campaigns)
+        stage.rows = len(spSearchTermDf)
 
+    with profiler.stage('rename') as stage:
+        spSearchTermDf = spSearchTermDf.rename(columns=_spst_column)
+        stage.rows = len(spSearchTermDf)
+
+    with profiler.stage('astype') as stage:
+        spSearchTermDf = spSearchTermDf.astype(backend_schema(project_schema(SPST_SCHEMA, spSearchTermDf, columns), dtype_backend))
+        stage.rows = len(spSearchTermDf)
+
+    profiler.finish()
     return spSearchTermDf
 
-def sbstreport(filePath:str):
-    sbSearchTermDf = pd.read_excel(filePath)
-    sbSearchTermDf = sbSearchTermDf.rename(columns=lambda X:X.replace('14','_14').replace('-','').replace('#','').replace('(','').replace(')','').replace(',','').replace(' ','_').lower())
-
-    schema = {
-        'date': 'datetime64[ns]',
-        'portfolio_name': str,
-        'currency': str,
-        'campaign_name': str,
-        'ad_group_name': str,
-        'targeting': str,
-        'match_type': str,
-        'customer_search_term': str,
-        'cost_type': str,
-        'impressions': float,
-        'viewable_impressions': float,
-        'clicks': float,
-        'clickthru_rate_ctr': float,
-        'spend': float,
-        'cost_per_click_cpc': float,
-        'cost_per_1000_viewable_impressions_vcpm': float,
-        'total_advertising_cost_of_sales_acos_': float,
-        'total_return_on_advertising_spend_roas': float,
-        '_14_day_total_sales_': float,
-        '_14_day_total_orders_': float,
-        '_14_day_total_units_': float,
-        '_14_day_conversion_rate': float,
-        'total_advertising_cost_of_sales_acos__click': float,
-        'total_return_on_advertising_spend_roas__click': float,
-        '_14_day_total_sales__click': float,
-        '_14_day_total_orders___click': float,
-        '_14_day_total_units___click': float
-    }
-
-    sbSearchTermDf = sbSearchTermDf.astype(schema)
+def sbstreport(filePath:str, dtype_backend:str=None, profile=None,
+               columns:list=None, dateRange=None, campaigns:list=None):
+    profiler = parse_profiler(profile, 'sbstreport')
+
+    with profiler.stage('read') as stage:
+        sbSearchTermDf, header = read_report(filePath, _sbst_column, False, dtype_backend, columns,
+                                            'date', dateRange, campaigns)
+        stage.rows = len(sbSearchTermDf)
+
+    with profiler.stage('rename') as stage:
+        sbSearchTermDf = sbSearchTermDf.rename(columns=_sbst_column)
+        stage.rows = len(sbSearchTermDf)
 
+    with profiler.stage('astype') as stage:
+        sbSearchTermDf = sbSearchTermDf.astype(backend_schema(project_schema(SBST_SCHEMA, sbSearchTermDf, columns), dtype_backend))
+        stage.rows = len(sbSearchTermDf)
+
+    profiler.finish()
     return sbSearchTermDf
 
-def sdtreport(filePath:str):
-    sdTargetingDf = pd.read_excel(filePath)
-    sdTargetingDf = sdTargetingDf.rename(columns=lambda X:X.replace('14','_14').replace('-','').replace('#','').replace('(','').replace(')','').replace(',','').replace(' ','_').lower())
-
-    schema = {
-        'date': 'datetime64[ns]',
-        'currency': str,
-        'campaign_name': str,
-        'portfolio_name': str,
-        'cost_type': str,
-        'ad_group_name': str,
-        'targeting': str,
-        'bid_optimization': str,
-        'impressions': float,
-        'viewable_impressions': float,
-        'clicks': float,
-        'clickthru_rate_ctr': float,
-        '_14_day_detail_page_views_dpv': float,
-        'spend': float,
-        'cost_per_click_cpc': float,
-        'cost_per_1000_viewable_impressions_vcpm': float,
-        'total_advertising_cost_of_sales_acos_': float,
-        'total_return_on_advertising_spend_roas': float,
-        '_14_day_total_orders_': float,
-        '_14_day_total_units_': float,
-        '_14_day_total_sales_': float,
-        '_14_day_newtobrand_orders_': float,
-        '_14_day_newtobrand_sales': float,
-        '_14_day_newtobrand_units_': float,
-        'total_advertising_cost_of_sales_acos__click': float,
-        'total_return_on_advertising_spend_roas__click': float,
-        '_14_day_total_orders___click': float,
-        '_14_day_total_units___click': float,
-        '_14_day_total_sales__click': float,
-        '_14_day_newtobrand_orders___click': float,
-        '_14_day_newtobrand_sales__click': float,
-        '_14_day_newtobrand_units___click': float
-    }
-
-    sdTargetingDf = sdTargetingDf.astype(schema)
+def sdtreport(filePath:str, dtype_backend:str=None, profile=None,
+              columns:list=None, dateRange=None, campaigns:list=None):
+    profiler = parse_profiler(profile, 'sdtreport')
+
+    with profiler.stage('read') as stage:
+        sdTargetingDf, header = read_report(filePath, _sdt_column, False, dtype_backend, columns,
+                                           'date', dateRange, campaigns)
+        stage.rows = len(sdTargetingDf)
+
+    with profiler.stage('rename') as stage:
+        sdTargetingDf = sdTargetingDf.rename(columns=_sdt_column)
+        stage.rows = len(sdTargetingDf)
 
+    with profiler.stage('astype') as stage:
+        sdTargetingDf = sdTargetingDf.astype(backend_schema(project_schema(SDT_SCHEMA, sdTargetingDf, columns), dtype_backend))
+        stage.rows = len(sdTargetingDf)
+
+    profiler.finish()
     return sdTargetingDf
 
-def spcreport(filePath:str):
-    spCampaignDf = pd.read_csv(filePath)
-    spCampaignDf = spCampaignDf.rename(columns=lambda X:X.replace('7','_7').replace('-','').replace('#','').replace('(','').replace(')','').replace(',','').replace(' ','_').lower())
-
-    colRange = spCampaignDf.columns[7:]
-    spCampaignDf[colRange] = spCampaignDf[colRange].replace({'%':'','\$':'',',':''}, regex=True)
-    spCampaignDf['date'] = pd.to_datetime(spCampaignDf['date'])
-
-    schema = {
-        'date': 'datetime64[ns]',
-        'portfolio_name': str,
-        'campaign_type': str,
-        'campaign_name': str,
-        'country': str,
-        'status': str,
-        'currency': str,
-        'budget': float,
-        'targeting_type': str,
-        'bidding_strategy': str,
-        'impressions': float,
-        'last_year_impressions': float,
-        'clicks': float,
-        'last_year_clicks': float,
-        'clickthru_rate_ctr': float,
-        'spend': float,
-        'last_year_spend': float,
-        'cost_per_click_cpc': float,
-        'last_year_cost_per_click_cpc': float,
-        '_7_day_total_orders_': float,
-        'total_advertising_cost_of_sales_acos_': float,
-        'total_return_on_advertising_spend_roas': float,
-        '_7_day_total_sales_': float
-    }
-
-    spCampaignDf = spCampaignDf.astype(schema)
+def spcreport(filePath:str, dtype_backend:str=None, profile=None,
+              columns:list=None, dateRange=None, campaigns:list=None):
+    profiler = parse_profiler(profile, 'spcreport')
+
+    with profiler.stage('read') as stage:
+        spCampaignDf, header = read_report(filePath, _spc_column, True, dtype_backend, columns,
+                                          'date', dateRange, campaigns)
+        stage.rows = len(spCampaignDf)
+
+    with profiler.stage('rename') as stage:
+        spCampaignDf = spCampaignDf.rename(columns=_spc_column)
+        stage.rows = len(spCampaignDf)
+
+    with profiler.stage('clean') as stage:
+        colRange = [col for col in header[7:] if col in spCampaignDf.columns]
+        spCampaignDf = strip_symbols(spCampaignDf, colRange, dtype_backend)
+        stage.rows = len(spCampaignDf)
+
+    with profiler.stage('dates') as stage:
+        if 'date' in spCampaignDf.columns:
+            spCampaignDf['date'] = pd.to_datetime(spCampaignDf['date'])
+        stage.rows = len(spCampaignDf)
+
+    with profiler.stage('astype') as stage:
+        spCampaignDf = spCampaignDf.astype(backend_schema(project_schema(SPC_SCHEMA, spCampaignDf, columns), dtype_backend))
+        stage.rows = len(spCampaignDf)
 
+    profiler.finish()
     return spCampaignDf
 
-def sbcreport(filePath:str):
-    sbCampaignDf = pd.read_excel(filePath)
-    sbCampaignDf = sbCampaignDf.rename(columns=lambda X:X.replace('14','_14').replace('5','_5').replace('-','').replace('#','').replace('(','').replace(')','').replace(',','').replace(' ','_').lower())
-
-    colRange = sbCampaignDf.columns[6:]
-    sbCampaignDf[colRange] = sbCampaignDf[colRange].replace({'%':'','\$':'',',':''}, regex=True)
-    sbCampaignDf['date'] = pd.to_datetime(sbCampaignDf['date'])
-
-    schema = {
-        'date': 'datetime64[ns]',
-        'portfolio_name': str,
-        'currency': str,
-        'campaign_name': str,
-        'cost_type': str,
-        'country': str,
-        'impressions': float,
-        'clicks': float,
-        'clickthru_rate_ctr': float,
-        'cost_per_click_cpc': float,
-        'spend': float,
-        'total_advertising_cost_of_sales_acos_': float,
-        'total_return_on_advertising_spend_roas': float,
-        '_14_day_total_sales_': float,
-        '_14_day_total_orders_': float,
-        '_14_day_total_units_': float,
-        '_14_day_conversion_rate': float,
-        'viewable_impressions': float,
-        'cost_per_1000_viewable_impressions_vcpm': float,
-        'viewthrough_rate_vtr': float,
-        'clickthrough_rate_for_views_vctr': float,
-        'video_first_quartile_views': float,
-        'video_midpoint_views': float,
-        'video_third_quartile_views': float,
-        'video_complete_views': float,
-        'video_unmutes': float,
-        '_5_second_views': float,
-        '_5_second_view_rate': float,
-        '_14_day_branded_searches': float,
-        '_14_day_detail_page_views_dpv': float,
-        '_14_day_newtobrand_orders_': float,
-        '_14_day_%_of_orders_newtobrand': float,
-        '_14_day_newtobrand_sales': float,
-        '_14_day_%_of_sales_newtobrand': float,
-        '_14_day_newtobrand_units_': float,
-        '_14_day_%_of_units_newtobrand': float,
-        '_14_day_newtobrand_order_rate': float,
-        'total_advertising_cost_of_sales_acos__click': float,
-        'total_return_on_advertising_spend_roas__click': float,
-        '_14_day_total_sales__click': float,
-        '_14_day_total_orders___click': float,
-        '_14_day_total_units___click': float,
-        'newtobrand_detail_page_views': float,
-        'newtobrand_detail_page_view_clickthrough_conversions': float,
-        'newtobrand_detail_page_view_rate': float,
-        'effective_cost_per_newtobrand_detail_page_view': float,
-        '_14_day_atc': float,
-        '_14_day_atc_clicks': float,
-        '_14_day_atcr': float,
-        'effective_cost_per_add_to_cart_ecpatc': float,
-        'branded_searches_clickthrough_conversions': float,
-        'branded_searches_rate': float,
-        'effective_cost_per_branded_search': float
-    }
-
-    sbCampaignDf = sbCampaignDf.astype(schema)
-    
+def sbcreport(filePath:str, dtype_backend:str=None, profile=None,
+              columns:list=None, dateRange=None, campaigns:list=None):
+    profiler = parse_profiler(profile, 'sbcreport')
+
+    with profiler.stage('read') as stage:
+        sbCampaignDf, header = read_report(filePath, _sbc_column, False, dtype_backend, columns,
+                                          'date', dateRange, campaigns)
+        stage.rows = len(sbCampaignDf)
+
+    with profiler.stage('rename') as stage:
+        sbCampaignDf = sbCampaignDf.rename(columns=_sbc_column)
+        stage.rows = len(sbCampaignDf)
+
+    with profiler.stage('clean') as stage:
+        colRange = [col for col in header[6:] if col in sbCampaignDf.columns]
+        sbCampaignDf = strip_symbols(sbCampaignDf, colRange, dtype_backend)
+        stage.rows = len(sbCampaignDf)
+
+    with profiler.stage('dates') as stage:
+        if 'date' in sbCampaignDf.columns:
+            sbCampaignDf['date'] = pd.to_datetime(sbCampaignDf['date'])
+        stage.rows = len(sbCampaignDf)
+
+    with profiler.stage('astype') as stage:
+        sbCampaignDf = sbCampaignDf.astype(backend_schema(project_schema(SBC_SCHEMA, sbCampaignDf, columns), dtype_backend))
+        stage.rows = len(sbCampaignDf)
+
+    profiler.finish()
     return sbCampaignDf
 
-def sdcreport(filePath:str):
-    sdCampaignDf = pd.read_excel(filePath)
-    sdCampaignDf = sdCampaignDf.rename(columns=lambda X:X.replace('14','_14').replace('-','').replace('#','').replace('(','').replace(')','').replace(',','').replace(' ','_').lower())
-
-    colRange = sdCampaignDf.columns[4:]
-    sdCampaignDf[colRange] = sdCampaignDf[colRange].replace({'%':'','\$':'',',':''}, regex=True)
-    sdCampaignDf['date'] = pd.to_datetime(sdCampaignDf['date'])
-
-    schema = {
-        'date': 'datetime64[ns]',
-        'country': str,
-        'status': str,
-        'currency': str,
-        'budget': float,
-        'campaign_name': str,
-        'portfolio_name': str,
-        'cost_type': str,
-        'impressions': float,
-        'viewable_impressions': float,
-        'clicks': float,
-        'clickthru_rate_ctr': float,
-        '_14_day_detail_page_views_dpv': float,
-        'spend': float,
-        'cost_per_click_cpc': float,
-        'cost_per_1000_viewable_impressions_vcpm': float,
-        'total_advertising_cost_of_sales_acos_': float,
-        'total_return_on_advertising_spend_roas': float,
-        '_14_day_total_orders_': float,
-        '_14_day_total_units_': float,
-        '_14_day_total_sales_': float,
-        '_14_day_newtobrand_orders_': float,
-        '_14_day_newtobrand_sales': float,
-        '_14_day_newtobrand_units_': float,
-        'total_advertising_cost_of_sales_acos__click': float,
-        'total_return_on_advertising_spend_roas__click': float,
-        '_14_day_total_orders___click': float,
-        '_14_day_total_units___click': float,
-        '_14_day_total_sales__click': float,
-        '_14_day_newtobrand_orders___click': float,
-        '_14_day_newtobrand_sales__click': float,
-        '_14_day_newtobrand_units___click': float,
-        'newtobrand_detail_page_views': float,
-        'newtobrand_detail_page_view_viewthrough_conversions': float,
-        'newtobrand_detail_page_view_clickthrough_conversions': float,
-        'newtobrand_detail_page_view_rate': float,
-        'effective_cost_per_newtobrand_detail_page_view': float,
-        '_14_day_atc': float,
-        '_14_day_atc_views': float,
-        '_14_day_atc_clicks': float,
-        '_14_day_atcr': float,
-        'effective_cost_per_add_to_cart_ecpatc': float,
-        '_14_day_branded_searches': float,
-        'branded_searches_viewthrough_conversions': float,
-        'branded_searches_clickthrough_conversions': float,
-        'branded_searches_rate': float,
-        'effective_cost_per_branded_search': float
-    }
-
-    sdCampaignDf = sdCampaignDf.astype(schema)
+def sdcreport(filePath:str, dtype_backend:str=None, profile=None,
+              columns:list=None, dateRange=None, campaigns:list=None):
+    profiler = parse_profiler(profile, 'sdcreport')
 
-    return sdCampaignDf
+    with profiler.stage('read') as stage:
+        sdCampaignDf, header = read_report(filePath, _sdc_column, False, dtype_backend, columns,
+                                          'date', dateRange, campaigns)
+        stage.rows = len(sdCampaignDf)
+
+    with profiler.stage('rename') as stage:
+        sdCampaignDf = sdCampaignDf.rename(columns=_sdc_column)
+        stage.rows = len(sdCampaignDf)
+
+    with profiler.stage('clean') as stage:
+        colRange = [col for col in header[4:] if col in sdCampaignDf.columns]
+        sdCampaignDf = strip_symbols(sdCampaignDf, colRange, dtype_backend)
+        stage.rows = len(sdCampaignDf)
 
+    with profiler.stage('dates') as stage:
+        if 'date' in sdCampaignDf.columns:
+            sdCampaignDf['date'] = pd.to_datetime(sdCampaignDf['date'])
+        stage.rows = len(sdCampaignDf)
+
+    with profiler.stage('astype') as stage:
+        sdCampaignDf = sdCampaignDf.astype(backend_schema(project_schema(SDC_SCHEMA, sdCampaignDf, columns), dtype_backend))
+        stage.rows = len(sdCampaignDf)
+
+    profiler.finish()
+    return sdCampaignDf
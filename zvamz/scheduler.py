@@ -0,0 +1,165 @@
+import inspect
+import threading
+from collections import deque
+from concurrent.futures import Future
+from .ratelimit import RateLimiter
+
+
+class AccountScheduler:
+    """
+    Run api pulls for many seller accounts at the same time.
+    Every account has its own RateLimiter, the next task is picked round robin
+    across accounts so a large account can not hold back the small ones,
+    and the number of worker threads caps the global concurrency.
+    """
+    def __init__(self, max_workers: int = 8, per_account: int = 2, tokens_per_second: float = 2, capacity: int = 30):
+        """
+        Parameters:
+        - max_workers: number of tasks running at the same time across all accounts
+        - per_account: number of tasks running at the same time for one account
+        - tokens_per_second: refill rate of each account RateLimiter
+        - capacity: bucket size of each account RateLimiter
+        """
+        if max_workers <= 0 or per_account <= 0:
+            raise ValueError("Error: max_workers and per_account must be greater than 0")
+        self.max_workers = max_workers
+        self.per_account = per_account
+        self.tokens_per_second = tokens_per_second
+        self.capacity = capacity
+
+        self.limiters = {}
+        self.queues = {}
+        self.running = {}
+        self.order = deque()
+        self.cond = threading.Condition()
+        self.threads = []
+        self.closed = False
+
+    def limiter(self, account):
+        """
+        Returns:
+        - the RateLimiter of the account, created on first use
+        """
+        with self.cond:
+            if account not in self.limiters:
+                self.limiters[account] = RateLimiter(self.tokens_per_second, self.capacity)
+            return self.limiters[account]
+
+    def submit(self, account, func, *args, **kwargs):
+        """
+        Queue a call for an account.
+        The account RateLimiter is passed as rate_limiter, and the account name as checkpoint_account
+        and account, when func accepts them.
+
+        Parameters:
+        - account: name of the seller account
+        - func: the function to call (ex. shipment_items)
+        - args, kwargs: arguments of the function
+
+        Returns:
+        - concurrent.futures.Future of the result
+        """
+        parameters = inspect.signature(func).parameters
+        if 'rate_limiter' not in kwargs and 'rate_limiter' in parameters:
+            kwargs['rate_limiter'] = self.limiter(account)
+        # checkpoints of different accounts must never share a folder
+        if 'checkpoint_account' not in kwargs and 'checkpoint_account' in parameters and account is not None:
+            kwargs['checkpoint_account'] = account
+        if 'account' not in kwargs and 'account' in parameters and account is not None:
+            kwargs['account'] = account
+
+        future = Future()
+        with self.cond:
+            if self.closed:
+                raise RuntimeError("Error: Scheduler is shut down")
+            if account not in self.queues:
+                self.queues[account] = deque()
+                self.running[account] = 0
+                self.order.append(account)
+            self.queues[account].append((future, func, args, kwargs))
+
+            if len(self.threads) < self.max_workers:
+                thread = threading.Thread(target=self._worker, daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            self.cond.notify()
+
+        return future
+
+    def _next_task(self):
+        # round robin over the accounts that have work and room to run it
+        for _ in range(len(self.order)):
+            account = self.order[0]
+            self.order.rotate(-1)
+            if self.queues[account] and self.running[account] < self.per_account:
+                self.running[account] += 1
+                return account, self.queues[account].popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                task = self._next_task()
+                while task is None:
+                    if self.closed and not any(self.queues.values()):
+                        return
+                    self.cond.wait()
+                    task = self._next_task()
+
+            account, (future, func, args, kwargs) = task
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(func(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self.cond:
+                    self.running[account] -= 1
+                    self.cond.notify_all()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop accepting tasks, the queued ones still run
+        """
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if wait:
+            for thread in self.threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown(wait=True)
+
+
+def pull_accounts(func, accounts: dict, max_workers: int = 8, per_account: int = 2, **kwargs):
+    """
+    Run the same pull for many accounts with fair sharing
+
+    Parameters:
+    - func: the api function (ex. shipment_summary)
+    - accounts: dictionary of account name and the arguments of that account
+      (ex. {'acme': {'marketplace_action': marketplaces.US, 'access_token': token}})
+    - max_workers: number of pulls running at the same time across all accounts
+    - per_account: number of pulls running at the same time for one account
+    - kwargs: arguments shared by all the accounts (ex. past_days=30)
+
+    Returns:
+    - dictionary of account name and result (or the exception raised for that account)
+    """
+    with AccountScheduler(max_workers, per_account) as scheduler:
+        futures = {account: scheduler.submit(account, func, **{**kwargs, **accountArgs})
+                   for account, accountArgs in accounts.items()}
+
+    results = {}
+    for account, future in futures.items():
+        try:
+            results[account] = future.result()
+        except Exception as e:
+            print(f"{account}: {e}")
+            results[account] = e
+    return results
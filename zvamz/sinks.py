@@ -0,0 +1,165 @@
+import os
+import pandas as pd
+from .reports import bgdeldup, bgdeldupf, bgdelkeys, dfbgcolcheck
+from .delta import FingerprintIndex
+
+
+def to_csv(df: pd.DataFrame, path: str, **kwargs):
+    """
+    Save a DataFrame to a csv file
+
+    Parameters:
+    - df: DataFrame to save
+    - path: the path of the csv file, parent folders are created
+
+    Returns:
+    - number of rows written
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    df.to_csv(path, index=False, **kwargs)
+    return len(df)
+
+
+def to_parquet(df: pd.DataFrame, path: str, **kwargs):
+    """
+    Save a DataFrame to a parquet file (needs pyarrow)
+
+    Parameters:
+    - df: DataFrame to save
+    - path: the path of the parquet file, parent folders are created
+
+    Returns:
+    - number of rows written
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    df.to_parquet(path, index=False, **kwargs)
+    return len(df)
+
+
+def _append_bigquery(df: pd.DataFrame, table: str, project_id: str):
+    """
+    Append a DataFrame to a BigQuery Table.
+    pyarrow backed DataFrames are handed to BigQuery as parquet built straight
+    from their arrow buffers, others go through pandas-gbq.
+    """
+    parts = table.split('.')
+    if not any(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes):
+        import pandas_gbq
+        pandas_gbq.to_gbq(df, '.'.join(parts[-2:]), project_id=project_id, if_exists='append')
+        return
+
+    import io
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from google.cloud import bigquery
+
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buffer)
+    buffer.seek(0)
+
+    client = bigquery.Client(project=project_id)
+    jobConfig = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.PARQUET,
+        write_disposition=bigquery.WriteDisposition.WRITE_APPEND
+    )
+    destination = table if len(parts) == 3 else f'{project_id}.{table}'
+    client.load_table_from_file(buffer, destination, job_config=jobConfig).result()
+
+
+def to_bigquery(df: pd.DataFrame, table: str, project_id: str = None, dateName: str = None,
+                minDate=None, free: bool = False, check_columns: bool = False):
+    """
+    Append a DataFrame to a BigQuery Table (needs pandas-gbq and google-cloud-bigquery,
+    pyarrow backed DataFrames are loaded as parquet without converting the columns).
+    When dateName is given the rows from minDate are deleted first to avoid duplicate.
+
+    Parameters:
+    - df: DataFrame to upload
+    - table: the BigQuery Table address (project.dataset.table)
+    - project_id: the BigQuery project, defaults to the project of the table
+    - dateName: the name of the date column used to delete the existing rows
+    - minDate: the start date that will be deleted, defaults to the earliest date of df
+    - free: use bgdeldupf (free version of BigQuery) instead of bgdeldup
+    - check_columns: compare the DataFrame and Table columns before the upload
+
+    Returns:
+    - number of rows uploaded
+    """
+    parts = table.split('.')
+    if project_id is None and len(parts) == 3:
+        project_id = parts[0]
+
+    if dateName or check_columns:
+        from google.cloud import bigquery
+        client = bigquery.Client(project=project_id)
+
+        if check_columns:
+            dfbgcolcheck(df, client, table)
+
+        if dateName:
+            if minDate is None:
+                minDate = df[dateName].min()
+            deldup = bgdeldupf if free else bgdeldup
+            deldup(dateName, minDate, client, table)
+
+    _append_bigquery(df, table, project_id)
+    return len(df)
+
+
+def to_bigquery_delta(df: pd.DataFrame, table: str, keyColumns: list, indexPath: str, project_id: str = None,
+                      seed: bool = False, free: bool = False):
+    """
+    Upload only the new or changed rows of a DataFrame to a BigQuery Table
+    instead of deleting from a date and reloading everything after it.
+    The rows already loaded are tracked in a local FingerprintIndex.
+
+    Parameters:
+    - df: DataFrame to upload
+    - table: the BigQuery Table address (project.dataset.table)
+    - keyColumns: list of columns that identify a row (ex. ['date', 'campaign_name'])
+    - indexPath: the .npz file of the fingerprint index of this table
+    - project_id: the BigQuery project, defaults to the project of the table
+    - seed: create the index when indexPath does not exist, every key of df is then
+      deleted from the table and uploaded again, so rows loaded before the index are not duplicated
+    - free: delete the changed keys by rewriting the table (free version of BigQuery, no DML)
+
+    Returns:
+    - number of rows uploaded
+    """
+    from google.cloud import bigquery
+
+    parts = table.split('.')
+    if project_id is None and len(parts) == 3:
+        project_id = parts[0]
+
+    if os.path.exists(indexPath):
+        index = FingerprintIndex(indexPath, keyColumns)
+        uploadDf, deleteDf = index.diff(df)
+    elif seed:
+        print(f"Seeding {indexPath}: replacing the {table} rows of every key")
+        index = FingerprintIndex(indexPath, keyColumns)
+        uploadDf, deleteDf = df, df[list(keyColumns)].drop_duplicates()
+    else:
+        raise FileNotFoundError(f"Error: No fingerprint index at {indexPath}, "
+                                f"pass seed=True for the first delta upload to {table}")
+
+    if len(deleteDf) > 0:
+        client = bigquery.Client(project=project_id)
+        bgdelkeys(deleteDf, client, table, free=free)
+    if len(uploadDf) > 0:
+        _append_bigquery(uploadDf, table, project_id)
+
+    index.commit(uploadDf)
+    return len(uploadDf)
+
+
+SINKS = {
+    'csv': to_csv,
+    'parquet': to_parquet,
+    'bigquery': to_bigquery,
+    'bigquery_delta': to_bigquery_delta
+}
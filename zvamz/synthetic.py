@@ -0,0 +1,217 @@
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from .reports import (
+    PROMO_SCHEMA,
+    SPST_SCHEMA,
+    SBST_SCHEMA,
+    SDT_SCHEMA,
+    SPC_SCHEMA,
+    SBC_SCHEMA,
+    SDC_SCHEMA
+)
+
+EXCEL_MAX_ROWS = 1048575
+
+LOWFEE_COLUMNS = [
+    ('Amazon store', 'store'),
+    ('Start date', 'date'),
+    ('End date', 'date'),
+    ('Parent ASIN', 'asin'),
+    ('ASIN', 'asin'),
+    ('FNSKU', 'fnsku'),
+    ('MSKU', 'sku'),
+    ('Currency code', 'currency'),
+    ('Average sales price', 'money'),
+    ('Units sold', 'count'),
+    ('Net sales', 'money'),
+    ('FBA fulfillment fees per unit', 'money'),
+    ('Low-inventory-level fee per unit', 'money'),
+    ('Low-inventory-level fee quantity', 'count'),
+    ('Low-inventory-level fee total', 'money')
+]
+
+VOCAB = {
+    'store': ['Amazon.com', 'Amazon.ca', 'Amazon.com.mx'],
+    'currency': ['USD'],
+    'country': ['United States', 'Canada', 'Mexico'],
+    'status': ['ENABLED', 'PAUSED', 'ARCHIVED'],
+    'campaign_type': ['Sponsored Products'],
+    'targeting_type': ['MANUAL', 'AUTO'],
+    'bidding_strategy': ['Dynamic bids - down only', 'Dynamic bids - up and down', 'Fixed bid'],
+    'match_type': ['EXACT', 'PHRASE', 'BROAD', '-'],
+    'cost_type': ['CPC', 'VCPM'],
+    'bid_optimization': ['Optimize for page visits', 'Optimize for conversions', 'Optimize for reach'],
+    'description': ['Buy 2 get 10% off', 'Lightning Deal', 'Coupon 15% off', 'Prime Day Deal'],
+    'promotion_rule_value': ['PercentOff', 'MoneyOff', 'BuyXGetY']
+}
+
+WORDS = np.array([
+    'organic', 'bamboo', 'kitchen', 'towel', 'reusable', 'bottle', 'steel', 'kids',
+    'travel', 'mug', 'wireless', 'charger', 'yoga', 'mat', 'pet', 'brush', 'storage',
+    'bins', 'led', 'lamp', 'desk', 'organizer', 'gift', 'set', 'premium', 'large'
+])
+
+
+def _header(col: str, sep: str = ' '):
+    """
+    Turn a cleaned column name back into the header found in the raw export,
+    so that the report function rename gives back the same cleaned name
+    """
+    if col.startswith('_') and col[1:2].isdigit():
+        col = col[1:]
+    return col.replace('_', sep).title()
+
+
+def _kind(col: str, dtype):
+    """
+    Decide what kind of values a report column holds from its name and schema type
+    """
+    if str(dtype).startswith('datetime64'):
+        return 'datetime_utc' if 'UTC' in str(dtype) else 'date'
+    if dtype is str:
+        if col in VOCAB:
+            return col
+        if col == 'customer_search_term':
+            return 'search_term'
+        if col == 'asin' or col == 'targeting':
+            return 'asin'
+        if col.endswith('_id'):
+            return 'id'
+        return 'name'
+    if any(key in col for key in ('rate', 'ctr', 'acos', '%', 'vtr')):
+        return 'pct'
+    if any(key in col for key in ('spend', 'sales', 'cpc', 'budget', 'vcpm', 'cost_per', 'roas', 'discount')):
+        return 'money'
+    return 'count'
+
+
+def _layout(schema: dict, sep: str = ' '):
+    return [(_header(col, sep), _kind(col, dtype)) for col, dtype in schema.items()]
+
+
+REPORT_LAYOUTS = {
+    'lowfeereport': {'format': 'csv', 'formatted': False, 'columns': LOWFEE_COLUMNS},
+    'promoreport': {'format': 'csv', 'formatted': False, 'columns': [
+        (col.replace('_', '-'), kind) for col, kind in
+        [(col, _kind(col, dtype)) for col, dtype in PROMO_SCHEMA.items()]
+    ]},
+    'spstreport': {'format': 'xlsx', 'formatted': False, 'columns': _layout(SPST_SCHEMA)},
+    'sbstreport': {'format': 'xlsx', 'formatted': False, 'columns': _layout(SBST_SCHEMA)},
+    'sdtreport': {'format': 'xlsx', 'formatted': False, 'columns': _layout(SDT_SCHEMA)},
+    'spcreport': {'format': 'csv', 'formatted': True, 'columns': _layout(SPC_SCHEMA)},
+    'sbcreport': {'format': 'xlsx', 'formatted': True, 'columns': _layout(SBC_SCHEMA)},
+    'sdcreport': {'format': 'xlsx', 'formatted': True, 'columns': _layout(SDC_SCHEMA)}
+}
+
+
+def _values(kind: str, rows: int, rng, formatted: bool, offset: int = 0):
+    """
+    Build one column of synthetic values
+    """
+    if kind == 'date':
+        start = np.datetime64(datetime.utcnow().date() - timedelta(days=60))
+        dates = start + rng.integers(0, 60, rows).astype('timedelta64[D]')
+        if formatted:
+            return pd.Series(pd.to_datetime(dates)).dt.strftime('%m/%d/%Y')
+        return pd.Series(pd.to_datetime(dates))
+    if kind == 'datetime_utc':
+        start = np.datetime64(datetime.utcnow() - timedelta(days=60), 's')
+        stamps = start + rng.integers(0, 60 * 86400, rows).astype('timedelta64[s]')
+        return pd.Series(pd.to_datetime(stamps)).dt.strftime('%Y-%m-%dT%H:%M:%S+00:00')
+    if kind in VOCAB:
+        return pd.Series(np.array(VOCAB[kind])[rng.integers(0, len(VOCAB[kind]), rows)])
+    if kind == 'search_term':
+        picks = WORDS[rng.integers(0, len(WORDS), (rows, 3))]
+        return pd.Series(picks[:, 0]).str.cat([pd.Series(picks[:, 1]), pd.Series(picks[:, 2])], sep=' ')
+    if kind == 'asin':
+        return 'B0' + pd.Series(rng.integers(0, 10**8, rows)).astype(str).str.zfill(8)
+    if kind == 'fnsku':
+        return 'X00' + pd.Series(rng.integers(0, 10**7, rows)).astype(str).str.zfill(7)
+    if kind == 'sku':
+        return 'SKU-' + pd.Series(rng.integers(0, 5000, rows)).astype(str)
+    if kind == 'id':
+        return pd.Series(np.arange(offset, offset + rows)).astype(str).str.zfill(12)
+    if kind == 'name':
+        return 'Campaign ' + pd.Series(rng.integers(0, 500, rows)).astype(str)
+
+    if kind == 'pct':
+        values = rng.random(rows).round(4)
+        if formatted:
+            return pd.Series(values * 100).map('{:.2f}%'.format)
+        return pd.Series(values)
+    if kind == 'money':
+        values = (rng.gamma(2.0, 40.0, rows)).round(2)
+        if formatted:
+            return pd.Series(values).map('${:,.2f}'.format)
+        return pd.Series(values)
+    values = rng.poisson(1500, rows)
+    if formatted:
+        return pd.Series(values).map('{:,}'.format)
+    return pd.Series(values)
+
+
+def synthetic_report(report: str, rows: int, seed: int = 0, offset: int = 0):
+    """
+    Build a DataFrame shaped like the raw export of a report
+
+    Parameters:
+    - report: name of the report function (ex. 'spcreport')
+    - rows: number of rows
+    - seed: seed of the random generator
+    - offset: starting number of generated ids
+
+    Returns:
+    - DataFrame with the raw headers and values of the report
+    """
+    if report not in REPORT_LAYOUTS:
+        raise ValueError(f"Error: No synthetic layout for {report}")
+
+    layout = REPORT_LAYOUTS[report]
+    rng = np.random.default_rng(seed)
+    data = {}
+    for header, kind in layout['columns']:
+        data[header] = _values(kind, rows, rng, layout['formatted'], offset).to_numpy()
+
+    return pd.DataFrame(data)
+
+
+def generate_report(report: str, rows: int, filePath: str = None, seed: int = 0, chunkRows: int = 100000):
+    """
+    Write a synthetic raw report file that can be read by the matching report function
+
+    Parameters:
+    - report: name of the report function (ex. 'spcreport')
+    - rows: number of rows, from 1k up to 10M for csv reports
+    - filePath: where to save the file, defaults to '<report>_<rows>.<format>'
+    - seed: seed of the random generator
+    - chunkRows: number of rows generated at a time for csv reports
+
+    Returns:
+    - the path of the written file
+    """
+    if report not in REPORT_LAYOUTS:
+        raise ValueError(f"Error: No synthetic layout for {report}")
+
+    fileFormat = REPORT_LAYOUTS[report]['format']
+    if filePath is None:
+        filePath = f'{report}_{rows}.{fileFormat}'
+
+    if fileFormat == 'xlsx':
+        if rows > EXCEL_MAX_ROWS:
+            raise ValueError(f"Error: {report} is an excel report, it can not hold more than {EXCEL_MAX_ROWS} rows")
+        synthetic_report(report, rows, seed).to_excel(filePath, index=False)
+        return filePath
+
+    if os.path.exists(filePath):
+        os.remove(filePath)
+
+    written = 0
+    while written < rows:
+        size = min(chunkRows, rows - written)
+        chunkDf = synthetic_report(report, size, seed + written, written)
+        chunkDf.to_csv(filePath, mode='a', header=written == 0, index=False)
+        written += size
+
+    return filePath